@@ -0,0 +1,313 @@
+from LR.AstNode import NodeFactory, run_semantic_action
+from util.BnfBuilder import BnfBuilder
+from util.GrammarIR import GrammarIR
+from util.Lexer import Token
+
+
+class LeoItem:
+    """
+    Leo's transitive item: completing `symbol` started at some set also completes `production` (origin `origin`),
+    and whatever `parent` completes after that. `top` is the topmost item of the chain.
+    """
+
+    def __init__(self, production: int, origin: int, parent):
+        self.production = production
+        self.origin = origin
+        self.parent = parent
+        self.top = parent.top if parent else (production, origin)
+
+    def chain(self):
+        item = self
+        while item:
+            yield item.production, item.origin
+            item = item.parent
+
+
+class EarleyParser:
+    """
+    Earley parser over BnfBuilder.production_map, works with any context free grammar.
+
+    * Aycock–Horspool: when predicting a nullable non-terminal the dot is moved over it right away, so ε productions
+      need no special completion.
+    * Leo: a completion that would only walk up a deterministic right recursive chain jumps to the topmost item, so
+      right recursion is linear instead of quadratic.
+
+    Items are tuples (production, dot, origin). Every Earley set keeps its items in a list and a set, and the items
+    waiting for a non-terminal are indexed by that symbol.
+    """
+
+    def __init__(self, bnf_file: str, eof: str = '$'):
+        self.bnf_builder = BnfBuilder(bnf_file)
+        self.bnf_builder.build()
+        self.epsilon = self.bnf_builder.epsilon
+        self.start_symbol = self.bnf_builder.start_symbol
+        self.non_terminals = self.bnf_builder.non_terminals
+        self.eof = eof
+        # production id -> (lhs, rhs without ε), and the index of its semantic action in grammar_list
+        self.productions = []
+        self.action_index = []
+        self.productions_of = {}
+        grammar_index = {}
+        for index, (lhs, _) in enumerate(self.bnf_builder.grammar_list):
+            grammar_index.setdefault(lhs, []).append(index)
+        for lhs, rules in self.bnf_builder.production_map.items():
+            for k, rule in enumerate(rules):
+                rhs = tuple(s for s in rule if s != self.epsilon)
+                self.productions_of.setdefault(lhs, []).append(len(self.productions))
+                self.productions.append((lhs, rhs))
+                self.action_index.append(grammar_index[lhs][k])
+        self.ir = GrammarIR(self.bnf_builder, eof)
+        self.nullable = self.ir.names(self.ir.nullable)
+        self.tokens = None
+        self.chart = None
+        self.ast = None
+        self.node_factory = NodeFactory()
+        self._null_trees = None
+
+    def recognize(self, tokens: list[Token]) -> int:
+        """
+        :return: -1 if the input is accepted, otherwise the index of the token where parsing fails
+        """
+        if tokens and tokens[-1].type == self.eof:
+            tokens = tokens[:-1]
+        self.tokens = tokens
+        n = len(tokens)
+        productions = self.productions
+        non_terminals = self.non_terminals
+        # per set: item list, item set, items waiting on a symbol, completed lhs -> origins, leo memo, used leo items
+        items = [[] for _ in range(n + 1)]
+        seen = [set() for _ in range(n + 1)]
+        waiting = [{} for _ in range(n + 1)]
+        completed = [{} for _ in range(n + 1)]
+        self.leo = [{} for _ in range(n + 1)]
+        self.leo_used = [[] for _ in range(n + 1)]
+        self.chart = (items, seen, waiting, completed)
+
+        for p in self.productions_of[self.start_symbol]:
+            items[0].append((p, 0, 0))
+            seen[0].add((p, 0, 0))
+
+        for i in range(n + 1):
+            current, current_seen, current_waiting = items[i], seen[i], waiting[i]
+            j = 0
+            while j < len(current):
+                item = current[j]
+                j += 1
+                p, dot, origin = item
+                lhs, rhs = productions[p]
+                if dot < len(rhs):
+                    symbol = rhs[dot]
+                    if symbol not in non_terminals:
+                        continue
+                    current_waiting.setdefault(symbol, []).append(item)
+                    for q in self.productions_of[symbol]:
+                        new = (q, 0, i)
+                        if new not in current_seen:
+                            current_seen.add(new)
+                            current.append(new)
+                    if symbol in self.nullable:
+                        new = (p, dot + 1, origin)
+                        if new not in current_seen:
+                            current_seen.add(new)
+                            current.append(new)
+                    continue
+                completed[i].setdefault(lhs, set()).add(origin)
+                if origin == i:
+                    # ε completion, already handled by moving over nullable symbols when predicting
+                    continue
+                leo = self.leo_item(origin, lhs)
+                if leo:
+                    self.leo_used[i].append(leo)
+                    top_production, top_origin = leo.top
+                    new = (top_production, len(productions[top_production][1]), top_origin)
+                    if new not in current_seen:
+                        current_seen.add(new)
+                        current.append(new)
+                    continue
+                for q, d, o in waiting[origin].get(lhs, ()):
+                    new = (q, d + 1, o)
+                    if new not in current_seen:
+                        current_seen.add(new)
+                        current.append(new)
+
+            if i == n:
+                break
+            # scan
+            word = tokens[i].type
+            for p, dot, origin in current:
+                rhs = productions[p][1]
+                if dot < len(rhs) and rhs[dot] == word:
+                    new = (p, dot + 1, origin)
+                    if new not in seen[i + 1]:
+                        seen[i + 1].add(new)
+                        items[i + 1].append(new)
+            if not items[i + 1]:
+                return i
+
+        return -1 if 0 in self.completed(n).get(self.start_symbol, ()) else n
+
+    def leo_item(self, position: int, symbol: str):
+        """
+        the Leo item of (position, symbol) exists if exactly one item of the set waits on symbol, and symbol is the
+        last symbol of that item.
+        """
+        pending = []
+        leo = None
+        while True:
+            memo = self.leo[position]
+            if symbol in memo:
+                leo = memo[symbol]
+                break
+            candidates = self.chart[2][position].get(symbol, ())
+            if len(candidates) != 1:
+                memo[symbol] = None
+                break
+            p, dot, origin = candidates[0]
+            if dot + 1 != len(self.productions[p][1]) or origin == position:
+                memo[symbol] = None
+                break
+            pending.append((position, symbol, p, origin))
+            position, symbol = origin, self.productions[p][0]
+        for position, symbol, p, origin in reversed(pending):
+            leo = LeoItem(p, origin, leo)
+            self.leo[position][symbol] = leo
+        return leo
+
+    def completed(self, i: int) -> dict[str, set[int]]:
+        """
+        completed items of set i as lhs -> origins, including the ones skipped by Leo items.
+        """
+        completed = self.chart[3][i]
+        used = self.leo_used[i]
+        while used:
+            for p, origin in used.pop().chain():
+                completed.setdefault(self.productions[p][0], set()).add(origin)
+        return completed
+
+    def parse(self, tokens: list[Token]):
+        """
+        recognize the input, then build the derivation tree as nested (symbol, children, production) tuples with tokens
+        as leaves and run the semantic actions over it (result in self.ast). Ambiguous input gets one of its derivations.
+        """
+        pos = self.recognize(tokens)
+        if pos != -1:
+            word = self.tokens[pos] if pos < len(self.tokens) else Token(self.eof, self.eof)
+            raise AssertionError(f"Parse failed at token {pos}: unexpected {word.type} '{word.value}'")
+        tree = self.build_tree(self.start_symbol, 0, len(self.tokens))
+        self.ast = self.evaluate(tree)
+        return tree
+
+    @staticmethod
+    def _run(generator):
+        """
+        Run a search written as generators without recursion: a generator yields the generator of a sub search and is
+        resumed with its result.
+        """
+        stack = [generator]
+        value = None
+        while stack:
+            try:
+                request = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+            stack.append(request)
+            value = None
+        return value
+
+    def build_tree(self, symbol: str, start: int, end: int):
+        return self._run(self._build_tree(symbol, start, end, set()))
+
+    def _build_tree(self, symbol: str, start: int, end: int, active: set):
+        if start == end and symbol in self.nullable:
+            return self.null_trees()[symbol]
+        key = (symbol, start, end)
+        if key in active:
+            return None
+        active.add(key)
+        try:
+            for p in self.productions_of[symbol]:
+                children = yield self._build_rhs(p, len(self.productions[p][1]), start, end, active)
+                if children is not None:
+                    return symbol, children, p
+            return None
+        finally:
+            active.discard(key)
+
+    def _build_rhs(self, p: int, dot: int, start: int, end: int, active: set):
+        """
+        children for rhs[:dot] deriving tokens[start:end], going from right to left. The Earley item (p, dot-1, start)
+        in set k proves that rhs[:dot-1] derives tokens[start:k].
+        """
+        if dot == 0:
+            return [] if start == end else None
+        seen = self.chart[1]
+        rhs = self.productions[p][1]
+        symbol = rhs[dot - 1]
+        if symbol not in self.non_terminals:
+            if end > start and self.tokens[end - 1].type == symbol and (p, dot - 1, start) in seen[end - 1]:
+                prefix = yield self._build_rhs(p, dot - 1, start, end - 1, active)
+                if prefix is not None:
+                    prefix.append(self.tokens[end - 1])
+                    return prefix
+            return None
+        origins = set(self.completed(end).get(symbol, ()))
+        if symbol in self.nullable:
+            origins.add(end)
+        for k in sorted(o for o in origins if start <= o <= end):
+            if (p, dot - 1, start) not in seen[k]:
+                continue
+            child = yield self._build_tree(symbol, k, end, active)
+            if child is None:
+                continue
+            prefix = yield self._build_rhs(p, dot - 1, start, k, active)
+            if prefix is not None:
+                prefix.append(child)
+                return prefix
+        return None
+
+    def null_trees(self) -> dict:
+        """
+        one tree of ε for every nullable symbol. They are built bottom up, a symbol takes its first production whose
+        symbols all have a tree already, so no tree refers to itself. Every use of a symbol shares its tree, and the
+        semantic actions still run once per use.
+        """
+        if self._null_trees is None:
+            trees = {}
+            is_change = True
+            while is_change:
+                is_change = False
+                for symbol in self.productions_of:
+                    if symbol not in self.nullable or symbol in trees:
+                        continue
+                    for p in self.productions_of[symbol]:
+                        rhs = self.productions[p][1]
+                        if all(s in trees for s in rhs):
+                            trees[symbol] = (symbol, [trees[s] for s in rhs], p)
+                            is_change = True
+                            break
+            self._null_trees = trees
+        return self._null_trees
+
+    def evaluate(self, tree):
+        """
+        run the semantic actions bottom up over the tree, in post order with an explicit stack
+        """
+        values = []
+        stack = [(tree, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if not isinstance(node, tuple):
+                values.append(node)
+                continue
+            symbol, children, p = node
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((c, False) for c in reversed(children))
+                continue
+            args = values[len(values) - len(children):]
+            del values[len(values) - len(children):]
+            values.append(run_semantic_action(self.bnf_builder.semantic_action[self.action_index[p]], args,
+                                              self.node_factory))
+        return values[0]
@@ -0,0 +1,115 @@
+import json
+
+from util.Lexer import Token
+
+
+class AstNode:
+    """
+    Base class of the AST nodes generated by NodeFactory. Each (type, fields) pair gets its own subclass with
+    __slots__, so a node costs one small object instead of a dict.
+    """
+    __slots__ = ()
+    node_type = None
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def fields(self) -> tuple:
+        return self.__slots__
+
+    def to_dict(self) -> dict:
+        """
+        convert the node and all its children to plain dicts, in the same shape the dict based semantic actions build.
+        """
+        result = {"type": self.node_type}
+        for name in self.__slots__:
+            result[name] = to_plain(getattr(self, name))
+        return result
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self, default=json_default, **kwargs)
+
+    def __eq__(self, other):
+        if not isinstance(other, AstNode):
+            return False
+        return self.node_type == other.node_type and self.__slots__ == other.__slots__ and all(
+            getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    # nodes compare by structure and their fields can be reassigned, so they are not hashable
+    __hash__ = None
+
+    def __repr__(self):
+        args = ', '.join(f'{n}={getattr(self, n)!r}' for n in self.__slots__)
+        return f'{self.node_type}({args})'
+
+
+def to_plain(value):
+    if isinstance(value, AstNode):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_plain(v) for v in value]
+    return value
+
+
+def json_default(value):
+    if isinstance(value, AstNode):
+        return value.to_dict()
+    raise TypeError(f'Object of type {value.__class__.__name__} is not JSON serializable')
+
+
+# node_type, fields(), to_dict()... of AstNode can't be used as field names
+RESERVED_FIELDS = frozenset(dir(AstNode))
+
+
+class NodeFactory:
+    """
+    Build AST nodes from semantic actions. It is exposed to the actions as ``node``:
+
+        E -> E + T
+        {
+            result = node("BinaryExpression", op=p2, left=p1, right=p3)
+        }
+
+    One class per node type and field list is generated on first use and cached.
+    """
+
+    def __init__(self):
+        self.node_classes = {}
+
+    def node_class(self, node_type: str, fields: tuple) -> type:
+        key = (node_type, fields)
+        cls = self.node_classes.get(key, None)
+        if cls is None:
+            reserved = [f for f in fields if f in RESERVED_FIELDS]
+            if reserved:
+                raise AssertionError(f"node {node_type}: field names {', '.join(reserved)} are reserved")
+            name = node_type if node_type.isidentifier() else 'Node'
+            cls = type(name, (AstNode,), {'__slots__': fields, 'node_type': node_type})
+            self.node_classes[key] = cls
+        return cls
+
+    def node(self, node_type: str, /, **fields) -> AstNode:
+        return self.node_class(node_type, tuple(fields))(*fields.values())
+
+    def __call__(self, node_type: str, /, **fields) -> AstNode:
+        return self.node(node_type, **fields)
+
+
+def run_semantic_action(semantic_action: str, values: list, node_factory: NodeFactory):
+    """
+    execute a semantic action `{ ... }` of the bnf file. p1...pn are the values of the rhs symbols, tokens are replaced
+    by their text, `node` is the node factory. An empty action gives {}.
+    """
+    if semantic_action:
+        semantic_action = semantic_action.strip()[1:-1].strip()
+    else:
+        semantic_action = """result={}"""
+    params = {
+        "result": None,
+        "node": node_factory,
+    }
+    for index, v in enumerate(values):
+        params[f"p{index + 1}"] = v.value if isinstance(v, Token) else v
+    exec(semantic_action, params)
+    return params.get("result")
@@ -0,0 +1,105 @@
+import numpy as np
+
+from LR.LR0Parser import LR0Parser
+from util.Lexer import Token
+
+ERROR = 0
+ACCEPT = np.iinfo(np.int32).min
+
+
+class BatchRecognizer:
+    """
+    Recognize many short inputs with the same LR tables in lock-step.
+
+    ACTION and GOTO are exported as dense int32 arrays. ACTION[state, token] is ERROR(0), shift to s (s + 1),
+    reduce by production g (-(g + 1)) or ACCEPT. All inputs advance one action per step: the current states and
+    tokens of the running lanes are gathered with one fancy index, and each lane keeps its state stack in a row of
+    a 2D array.
+    """
+
+    def __init__(self, parser: LR0Parser):
+        if parser.action_table is None:
+            raise AssertionError('build parse table before exporting it')
+        self.parser = parser
+        # token and non-terminal columns are the symbol ids of the grammar IR
+        ir = parser.ir
+        self.terminals = list(ir.symbols[:ir.terminal_count])
+        self.terminal_ids = {t: i for i, t in enumerate(self.terminals)}
+        self.non_terminals = list(ir.symbols[ir.terminal_count:])
+        non_terminal_ids = {nt: i for i, nt in enumerate(self.non_terminals)}
+        states = len(parser.lr0_states)
+        # one extra column for token types the grammar doesn't know, always an error
+        self.action = np.zeros((states, len(self.terminals) + 1), dtype=np.int32)
+        self.goto = np.full((states, len(self.non_terminals)), -1, dtype=np.int32)
+        for (state, terminal), action in parser.action_table.items():
+            if isinstance(action, list):
+                raise AssertionError(f'parsing table conflict in state {state} on {terminal}')
+            if terminal not in self.terminal_ids:
+                continue
+            if action[0] == 's':
+                value = action[1] + 1
+            elif action[0] == 'r':
+                value = -(action[1] + 1)
+            else:
+                value = ACCEPT
+            self.action[state, self.terminal_ids[terminal]] = value
+        for (state, nt), target in parser.goto_table.items():
+            self.goto[state, non_terminal_ids[nt]] = target
+        self.rhs_length = np.diff(np.array(ir.rhs_offset, dtype=np.int32))
+        self.lhs = np.array(ir.lhs, dtype=np.int32) - ir.terminal_count
+
+    def encode(self, batch: list[list[Token]]) -> np.ndarray:
+        """
+        token ids of the batch as a (inputs, longest input + 1) array padded with eof.
+        """
+        eof = self.terminal_ids[self.parser.eof]
+        unknown = len(self.terminals)
+        width = max((len(tokens) for tokens in batch), default=0) + 1
+        ids = np.full((len(batch), width), eof, dtype=np.int32)
+        for row, tokens in enumerate(batch):
+            ids[row, :len(tokens)] = [self.terminal_ids.get(t.type, unknown) for t in tokens]
+        return ids
+
+    def recognize(self, batch: list[list[Token]]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :param batch: token lists, the trailing eof token is optional
+        :return: (accepted, error position), the error position is -1 for accepted inputs
+        """
+        return self.recognize_ids(self.encode(batch))
+
+    def recognize_ids(self, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        lanes, width = ids.shape
+        action, goto, rhs_length, lhs = self.action, self.goto, self.rhs_length, self.lhs
+        # without ε productions the stack never holds more states than shifted tokens + 1
+        stack = np.zeros((lanes, width + 1), dtype=np.int32)
+        sp = np.zeros(lanes, dtype=np.int64)
+        pos = np.zeros(lanes, dtype=np.int64)
+        accepted = np.zeros(lanes, dtype=bool)
+        error_pos = np.full(lanes, -1, dtype=np.int64)
+        active = np.arange(lanes)
+        while active.size:
+            top = sp[active]
+            act = action[stack[active, top], ids[active, np.minimum(pos[active], width - 1)]]
+
+            shift = act > 0
+            if shift.any():
+                lane = active[shift]
+                sp[lane] += 1
+                stack[lane, sp[lane]] = act[shift] - 1
+                pos[lane] += 1
+
+            reduce = (act < 0) & (act != ACCEPT)
+            if reduce.any():
+                lane = active[reduce]
+                g = -act[reduce] - 1
+                sp[lane] -= rhs_length[g]
+                target = goto[stack[lane, sp[lane]], lhs[g]]
+                sp[lane] += 1
+                stack[lane, sp[lane]] = target
+
+            done = act == ACCEPT
+            accepted[active[done]] = True
+            failed = act == ERROR
+            error_pos[active[failed]] = pos[active[failed]]
+            active = active[~(done | failed)]
+        return accepted, error_pos
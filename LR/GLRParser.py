@@ -0,0 +1,346 @@
+from LR.LALR1Parser import LALR1Parser
+from util.Lexer import Token
+
+
+class SPPFNode:
+    """
+    Symbol node of a shared packed parse forest. All derivations of `symbol` over the tokens [start, end) share one
+    node, each derivation is a packed family (production id, children).
+
+    Families are binarised: for a rhs X1 X2 ... Xm with m > 2 the children are (X1, rest), rest being the
+    IntermediateNode of X2 ... Xm, so derivations that only differ in how the rest is split share that node.
+    derivations() gives the children with the intermediate nodes expanded.
+    """
+
+    def __init__(self, symbol: str, start: int, end: int):
+        self.symbol = symbol
+        self.start = start
+        self.end = end
+        self.families = []
+        self._family_set = set()
+
+    def add_family(self, production: int, children: tuple):
+        # forest nodes and tokens compare by identity
+        family = (production, children)
+        if family not in self._family_set:
+            self._family_set.add(family)
+            self.families.append(family)
+
+    def derivations(self):
+        """
+        (production, children) for every derivation at this node, one child per rhs symbol. Child symbol nodes are not
+        expanded.
+        """
+        for production, children in self.families:
+            for sequence in _expand_sequences(children):
+                yield production, sequence
+
+    def is_ambiguous(self) -> bool:
+        if len(self.families) > 1:
+            return True
+        rest = self.families[0][1][-1]
+        while isinstance(rest, IntermediateNode):
+            if len(rest.families) > 1:
+                return True
+            rest = rest.families[0][-1]
+        return False
+
+    def count_trees(self, cache: dict = None) -> int:
+        cache = {} if cache is None else cache
+        for node in _post_order(self, cache):
+            total = 0
+            for family in node.families:
+                children = family[1] if isinstance(node, SPPFNode) else family
+                count = 1
+                for c in children:
+                    count *= cache[id(c)] if isinstance(c, (SPPFNode, IntermediateNode)) else 1
+                total += count
+            cache[id(node)] = total
+        return cache[id(self)]
+
+    def trees(self):
+        """
+        enumerate the derivation trees as nested (symbol, children) tuples, leaves are tokens. The trees of every node
+        are built once, children before parents, and shared by the trees above it.
+        """
+        memo = {}
+        for node in _post_order(self, memo):
+            if isinstance(node, SPPFNode):
+                memo[id(node)] = [(node.symbol, sequence) for _, children in node.families
+                                  for sequence in _combine(children, memo)]
+            else:
+                memo[id(node)] = [sequence for children in node.families for sequence in _combine(children, memo)]
+        return iter(memo[id(self)])
+
+    def __repr__(self):
+        return f"{self.symbol}[{self.start},{self.end})"
+
+
+class IntermediateNode:
+    """
+    The symbols rhs[index:] of production `production` over the tokens [start, end). Each family is a pair (child of
+    rhs[index], rest), rest being the intermediate node of rhs[index + 1:] or the child of the last symbol.
+    """
+
+    def __init__(self, production: int, index: int, start: int, end: int):
+        self.production = production
+        self.index = index
+        self.start = start
+        self.end = end
+        self.families = []
+        self._family_set = set()
+
+    def add_family(self, children: tuple):
+        if children not in self._family_set:
+            self._family_set.add(children)
+            self.families.append(children)
+
+    def __repr__(self):
+        return f"({self.production}, {self.index})[{self.start},{self.end})"
+
+
+def _forest_children(node) -> list:
+    if isinstance(node, SPPFNode):
+        return [c for _, children in node.families for c in children]
+    return [c for children in node.families for c in children]
+
+
+def _post_order(root, done: dict):
+    """
+    symbol and intermediate nodes below root (included) whose id is not in done yet, each once, children before
+    parents. Walks the forest with an explicit stack.
+    """
+    visited = set()
+    active = set()
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            active.discard(id(node))
+            yield node
+            continue
+        if id(node) in done or id(node) in visited:
+            if id(node) in active:
+                raise AssertionError(f'cyclic parse forest at {node}, it has infinitely many trees')
+            continue
+        visited.add(id(node))
+        active.add(id(node))
+        stack.append((node, True))
+        for c in reversed(_forest_children(node)):
+            if isinstance(c, (SPPFNode, IntermediateNode)) and id(c) not in done:
+                if id(c) in active:
+                    raise AssertionError(f'cyclic parse forest at {c}, it has infinitely many trees')
+                stack.append((c, False))
+
+
+def _expand_sequences(children: tuple) -> list[list]:
+    """
+    the child sequences of a family, the trailing intermediate nodes expanded into all their families.
+    """
+    sequences = []
+    pending = [([], children)]
+    while pending:
+        prefix, rest = pending.pop()
+        *heads, last = rest
+        if isinstance(last, IntermediateNode):
+            for family in reversed(last.families):
+                pending.append((prefix + heads, family))
+        else:
+            sequences.append(prefix + list(rest))
+    return sequences
+
+
+def _combine(children: tuple, memo: dict) -> list[list]:
+    """
+    child tree sequences of a family from the trees of its children in memo. An intermediate child contributes the
+    sequences of the rest of the rhs.
+    """
+    sequences = [[]]
+    for c in children:
+        if isinstance(c, SPPFNode):
+            options = [[tree] for tree in memo[id(c)]]
+        elif isinstance(c, IntermediateNode):
+            options = memo[id(c)]
+        else:
+            options = [[c]]
+        sequences = [sequence + option for sequence in sequences for option in options]
+    return sequences
+
+
+def _first_derivation(node: SPPFNode) -> tuple[int, list]:
+    """
+    the first family of node with the first family of its intermediate nodes expanded
+    """
+    production, children = node.families[0]
+    result = []
+    while isinstance(children[-1], IntermediateNode):
+        result.extend(children[:-1])
+        children = children[-1].families[0]
+    result.extend(children)
+    return production, result
+
+
+class GSSNode:
+    """
+    Node of the graph structured stack. edges maps the previous node to the SPPF node (or token) of the symbol
+    between them.
+    """
+
+    def __init__(self, state: int, level: int):
+        self.state = state
+        self.level = level
+        self.edges = {}
+
+    def __repr__(self):
+        return f"GSS({self.state}@{self.level})"
+
+
+class GLRParser(LALR1Parser):
+    """
+    Generalized LR parser(Tomita) over the LALR(1) automaton.
+
+    Conflicts left in the parsing table after resolve_ambiguity (precedence and association) are kept as action
+    lists. All parse stacks are merged into a graph structured stack, so each (state, position) exists once, and
+    every (symbol, start, end) is one shared node of the parse forest. On deterministic input this is an ordinary
+    LR parse. As in the rest of the LR package, ε productions are not supported.
+    """
+
+    def __init__(self, bnf_file: str, eof: str = '$', **kwargs):
+        super().__init__(bnf_file, eof, **kwargs)
+        self.allow_conflicts = True
+        self.forest = None
+
+    def actions(self, state: int, symbol: str) -> list[tuple]:
+        action = self.action_table.get((state, symbol), None)
+        if action is None:
+            return []
+        return action if isinstance(action, list) else [action]
+
+    def parse(self, tokens: list[Token]) -> SPPFNode:
+        """
+        for each token:
+            1. apply all reductions of the frontier. a reduction that ends in an existing node only adds an edge (new
+            reductions are done only through the new edge), or a packed family if the edge already exists.
+            2. shift the token from every frontier node that can shift it, merging nodes by state.
+
+        Reductions go back one GSS edge at a time (binarised, as in BRNGLR). After k edges the symbols rhs[m-k:] of
+        the production are one shared node, the first edge gives the child itself and later ones an IntermediateNode.
+        Going on from a GSS node with that shared node is done once per level for every (production, k, node), so
+        paths through the GSS are never enumerated and parsing stays within O(n^3).
+
+        :param tokens:
+        :return: the root of the shared packed parse forest
+        """
+        old_start = self.grammar_list[0][1][0]
+        frontier = {0: GSSNode(0, 0)}
+        pos = 0
+        while True:
+            word = tokens[pos]
+            sppf_nodes = {}
+            intermediates = {}
+            continued = set()
+            todo = []
+
+            def complete(end: GSSNode, g: int, children: tuple):
+                lhs = self.grammar_list[g][0]
+                goto_state = self.goto_table.get((end.state, lhs), None)
+                if goto_state is None:
+                    return
+                key = (lhs, end.level)
+                sppf = sppf_nodes.get(key, None)
+                if sppf is None:
+                    sppf = SPPFNode(lhs, end.level, pos)
+                    sppf_nodes[key] = sppf
+                sppf.add_family(g, children)
+                target = frontier.get(goto_state, None)
+                if target is None:
+                    target = GSSNode(goto_state, pos)
+                    target.edges[end] = sppf
+                    frontier[goto_state] = target
+                    for a in self.actions(goto_state, word.type):
+                        if a[0] == 'r':
+                            todo.append((target, a[1], None))
+                elif end not in target.edges:
+                    target.edges[end] = sppf
+                    for a in self.actions(goto_state, word.type):
+                        if a[0] == 'r' and len(self.grammar_list[a[1]][1]) > 0:
+                            todo.append((target, a[1], (end, sppf)))
+
+            for node in frontier.values():
+                for a in self.actions(node.state, word.type):
+                    if a[0] == 'r':
+                        todo.append((node, a[1], None))
+            while todo:
+                node, g, first_edge = todo.pop()
+                m = len(self.grammar_list[g][1])
+                # (gss node, j, rest): rest is the shared node of rhs[j:] over [gss node level, pos)
+                work = []
+                for prev, label in ([first_edge] if first_edge else list(node.edges.items())):
+                    if m == 1:
+                        complete(prev, g, (label,))
+                    elif (g, m - 1, prev) not in continued:
+                        # the edge label of rhs[m-1] is the same node for every path into prev
+                        continued.add((g, m - 1, prev))
+                        work.append((prev, m - 1, label))
+                while work:
+                    node, j, rest = work.pop()
+                    for prev, label in node.edges.items():
+                        if j == 1:
+                            complete(prev, g, (label, rest))
+                            continue
+                        key = (g, j - 1, prev.level)
+                        intermediate = intermediates.get(key, None)
+                        if intermediate is None:
+                            intermediate = IntermediateNode(g, j - 1, prev.level, pos)
+                            intermediates[key] = intermediate
+                        intermediate.add_family((label, rest))
+                        if (g, j - 1, prev) not in continued:
+                            continued.add((g, j - 1, prev))
+                            work.append((prev, j - 1, intermediate))
+
+            if word.type == self.eof:
+                for node in frontier.values():
+                    if ('acc',) in self.actions(node.state, word.type):
+                        for prev, sppf in node.edges.items():
+                            if prev.level == 0 and prev.state == 0 and isinstance(sppf, SPPFNode) \
+                                    and sppf.symbol == old_start:
+                                self.forest = sppf
+                                return sppf
+                raise AssertionError(f"Parse failed at token {pos}: unexpected end of input")
+
+            next_frontier = {}
+            for node in frontier.values():
+                for a in self.actions(node.state, word.type):
+                    if a[0] == 's':
+                        target = next_frontier.get(a[1], None)
+                        if target is None:
+                            target = GSSNode(a[1], pos + 1)
+                            next_frontier[a[1]] = target
+                        target.edges[node] = word
+            if not next_frontier:
+                raise AssertionError(f"Parse failed at token {pos}: unexpected {word.type} '{word.value}'")
+            frontier = next_frontier
+            pos += 1
+
+    def evaluate(self, node: SPPFNode = None, cache: dict = None):
+        """
+        run the semantic actions over the forest, choosing the first packed family of ambiguous nodes. The nodes are
+        evaluated children first with an explicit stack.
+        """
+        node = self.forest if node is None else node
+        cache = {} if cache is None else cache
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if id(current) in cache:
+                continue
+            g, children = _first_derivation(current)
+            if expanded:
+                values = [cache[id(c)] if isinstance(c, SPPFNode) else c for c in children]
+                cache[id(current)] = self.run_semantic_action(g, values)
+                continue
+            stack.append((current, True))
+            for c in reversed(children):
+                if isinstance(c, SPPFNode) and id(c) not in cache:
+                    stack.append((c, False))
+        return cache[id(node)]
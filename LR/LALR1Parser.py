@@ -3,8 +3,8 @@ from LR.LR1Parser import LR1Parser, Item1
 
 
 class LALR1Parser(LR1Parser):
-    def __init__(self, bnf_file: str, eof: str = '$'):
-        super().__init__(bnf_file, eof)
+    def __init__(self, bnf_file: str, eof: str = '$', **kwargs):
+        super().__init__(bnf_file, eof, **kwargs)
 
     def group_indices(self, A):
         index_list = []
@@ -43,7 +43,7 @@ class LALR1Parser(LR1Parser):
                 item0, lookahead = i.split()
                 item0_set.add(item0)
                 if item0 not in state_item_lookahead[index]:
-                    state_item_lookahead[index][item0] = set(lookahead)
+                    state_item_lookahead[index][item0] = {lookahead}
                 else:
                     state_item_lookahead[index][item0].add(lookahead)
             item_set.append(item0_set)
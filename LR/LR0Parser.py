@@ -1,11 +1,9 @@
 import copy
 import json
 
-import jsbeautifier
-from graphviz import Digraph
-from prettytable import PrettyTable, ALL
-
+from LR.AstNode import NodeFactory, json_default, run_semantic_action
 from util.BnfBuilder import BnfBuilder
+from util.GrammarIR import GrammarIR
 from util.Lexer import Token
 
 
@@ -76,13 +74,35 @@ class LRState:
         return self.__str__()
 
 
+class ParseError:
+    def __init__(self, pos: int, token: Token, state: int, expected: list[str]):
+        self.pos = pos
+        self.token = token
+        self.state = state
+        self.expected = expected
+
+    def __str__(self) -> str:
+        return f"syntax error at token {self.pos}: unexpected {self.token.type} '{self.token.value}', " \
+               f"expected one of {' '.join(self.expected)}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
 class LR0Parser:
 
     def __init__(self, bnf_file: str, eof: str = '$', print_ast=True, show_parsing_table=True, show_graph_state=True,
-                 print_first_follow=True, show_parsing_steps=True):
+                 print_first_follow=True, show_parsing_steps=True, sync_tokens: list[str] = None,
+                 reduce_grammar=False, inline_identity=False):
         self.bnf_file = bnf_file
         self.bnf_builder = BnfBuilder(bnf_file)
         self.bnf_builder.build()
+        # 去掉无用符号和重复产生式，得到更小的自动机
+        self.reduction_report = self.bnf_builder.reduce_grammar(inline_identity) if reduce_grammar else None
+        if self.reduction_report and show_parsing_table:
+            before, after = self.reduction_report['before'], self.reduction_report['after']
+            print(f"grammar reduction: {before['non_terminals']} -> {after['non_terminals']} non-terminals, "
+                  f"{before['productions']} -> {after['productions']} productions")
         self.grammar = self.bnf_builder.production_map
         self.grammar_list = self.bnf_builder.grammar_list
         self.semantic_action = self.bnf_builder.semantic_action
@@ -91,6 +111,9 @@ class LR0Parser:
         self.epsilon = self.bnf_builder.epsilon
         self.start_symbol = self.bnf_builder.start_symbol
         self.precedence = self.bnf_builder.precedence
+        self.error_symbol = self.bnf_builder.error_symbol
+        self.sync_tokens = set(self.bnf_builder.sync_tokens if sync_tokens is None else sync_tokens)
+        self.errors = []
         self.eof = eof
         self.lr0_states = None
         self.lr0_trans_function = None
@@ -98,10 +121,15 @@ class LR0Parser:
         self.action_table = None
         self.goto_table = None
         self.parsing_table = None
-        self.bnf_builder.build_first_set()
-        self.bnf_builder.build_follow_set()
-        self.first_set = self.bnf_builder.first_set
-        self.follow_set = self.bnf_builder.follow_set
+        self.unit_goto_table = {}
+        self.unit_reductions_skipped = 0
+        # keep conflicting actions as lists instead of failing, used by GLRParser
+        self.allow_conflicts = False
+        self.node_factory = NodeFactory()
+        # nullable/FIRST/FOLLOW are computed once on the integer grammar, production ids match the augmented grammar_list
+        self.ir = GrammarIR(self.bnf_builder, eof, augment=True)
+        self.first_set = self.ir.first_set()
+        self.follow_set = self.ir.follow_set()
         self.augment_grammar()
         if print_first_follow:
             self.print_first_follow()
@@ -112,6 +140,8 @@ class LR0Parser:
         self.show_parsing_steps = show_parsing_steps
 
     def print_first_follow(self):
+        from prettytable import PrettyTable
+
         x = PrettyTable()
         x.title = 'First & Follow set'
         x.field_names = ["Symbol", "First", "Follow"]
@@ -121,6 +151,8 @@ class LR0Parser:
         print(x)
 
     def graph_state(self, states: list[LRState], trans: dict[tuple:int], acton_table: dict):
+        from graphviz import Digraph
+
         dot = Digraph("state transaction", node_attr={'shape': 'box'}, engine='neato')
         # dot.attr(rankdir='LR')
         # dot.attr(splines='ortho')
@@ -164,6 +196,8 @@ class LR0Parser:
     # dot.render('test.gv', view=True)
 
     def print_state(self, states: list[LRState], trans: dict[tuple:int]):
+        from prettytable import PrettyTable
+
         print('LR0 states')
         print()
         print('++++++++')
@@ -196,7 +230,7 @@ class LR0Parser:
         self.non_terminals.add(new_start)
         self.start_symbol = new_start
         self.first_set[new_start] = self.first_set[old_start]
-        self.follow_set[new_start] = set(self.eof)
+        self.follow_set[new_start] = {self.eof}
         self.init_state = LRState(0, (self.closure([Item0(f"{new_start}", (old_start,), 0)])))
         self.grammar_list.insert(0, (new_start, (old_start,)))
         self.semantic_action.insert(0, None)
@@ -342,7 +376,8 @@ class LR0Parser:
         :param trans_map:
         :return:
         """
-        self.print_grammar()
+        if self.show_parsing_table:
+            self.print_grammar()
         action_table = {}
         goto_table = {}
         keys = self.lr0_trans_function.keys()
@@ -400,9 +435,10 @@ class LR0Parser:
         self.parsing_table = {**action_table, **goto_table}
         if self.show_graph_state:
             self.graph_state(self.lr0_states, self.lr0_trans_function, self.action_table)
-        for k in self.parsing_table:
-            if isinstance(self.parsing_table[k], list):
-                raise AssertionError(f'parsing table conflict')
+        if not self.allow_conflicts:
+            for k in self.parsing_table:
+                if isinstance(self.parsing_table[k], list):
+                    raise AssertionError(f'parsing table conflict')
 
         return action_table, goto_table
 
@@ -468,6 +504,49 @@ class LR0Parser:
                 # choose top grammar
                 self.action_table[key] = a0 if a0[1] < a1[1] else a1
 
+    def is_identity_unit_production(self, index: int) -> bool:
+        """
+        A -> B where B is a non-terminal and the semantic action just passes the child value up (result=p1).
+        """
+        lhs, rhs = self.grammar_list[index]
+        if len(rhs) != 1 or not self.is_non_terminal(rhs[0]) or lhs == self.start_symbol:
+            return False
+        return self.bnf_builder.is_identity_action(self.semantic_action[index])
+
+    def eliminate_unit_productions(self) -> int:
+        """
+        消除单产生式(chain rule)归约
+
+        对于语义动作为 result=p1 的单产生式 A -> B，归约 B 后在 goto(s, B) 状态上遇到 lookahead a 只会继续归约 A -> B，
+        然后跳到 goto(s, A)。所以可以预先计算 (s, B, a) -> (goto(s, A), A)，在解析时直接跳过这些中间归约。
+        必须在 build_parse_table 之后调用。
+
+        :return: number of (state, symbol, lookahead) entries that bypass at least one unit reduction
+        """
+        if self.parsing_table is None:
+            raise AssertionError('build parse table before eliminating unit productions')
+        self.unit_goto_table = {}
+        lookaheads = list(self.terminals) + [self.eof]
+        for (state, symbol), target in self.goto_table.items():
+            for a in lookaheads:
+                lhs, goto_state, skipped = symbol, target, 0
+                visited = {goto_state}
+                while True:
+                    action = self.action_table.get((goto_state, a), None)
+                    if not action or action[0] != 'r' or not self.is_identity_unit_production(action[1]):
+                        break
+                    next_lhs = self.grammar_list[action[1]][0]
+                    next_state = self.goto_table.get((state, next_lhs), None)
+                    if next_state is None or next_state in visited:
+                        break
+                    visited.add(next_state)
+                    lhs, goto_state, skipped = next_lhs, next_state, skipped + 1
+                if skipped:
+                    self.unit_goto_table[(state, symbol, a)] = (goto_state, lhs, skipped)
+        if self.show_parsing_table:
+            print(f'unit production elimination: {len(self.unit_goto_table)} goto entries bypass unit reductions')
+        return len(self.unit_goto_table)
+
     def lookup_grammar(self, lhs: str, rhs: tuple) -> int:
         for index, g in enumerate(self.grammar_list):
             if g[0] == lhs and g[1] == rhs:
@@ -475,6 +554,8 @@ class LR0Parser:
         raise AssertionError(f"rule {lhs} -> {' '.join(rhs)} not found")
 
     def print_grammar(self):
+        from prettytable import PrettyTable
+
         x = PrettyTable()
         x.title = "Grammar"
         for index, g in enumerate(self.grammar_list):
@@ -485,6 +566,8 @@ class LR0Parser:
         print(x)
 
     def print_parsing_table(self, action_table: dict, goto_table: dict, states: list[LRState], grammar: dict):
+        from prettytable import PrettyTable, ALL
+
         x = PrettyTable()
 
         x.title = f'{self.__class__.__name__} Parsing Table'
@@ -514,7 +597,7 @@ class LR0Parser:
 
         print(x)
 
-    def parse(self, tokens: list[Token]):
+    def parse(self, tokens: list[Token], recover: bool = False):
         """
         push $
         push start state s0
@@ -537,79 +620,253 @@ class LR0Parser:
         report success
 
         https://serokell.io/blog/how-to-implement-lr1-parser
+
+        With recover=True syntax errors don't stop the parse. Each error is recorded in self.errors and the parser
+        recovers (see recover_error), so all errors of the input are collected in a single pass.
         :param tokens:
+        :param recover:
         :return:
         """
         steps = []
         stage = 0
+        self.unit_reductions_skipped = 0
+        self.errors = []
         stack = [(0, Token(self.eof, self.eof))]
         pos = 0
         word = tokens[pos]
         value_stack = []
+        # position where the last recovery resumed, errors there are not reported twice
+        error_pos = -1
         while True:
             # stage,stack,symbols,input,action
             stage += 1
-            stack_ = " ".join([str(s[0]) for s in stack])
-            symbol_ = " ".join([s[1] if isinstance(s[1], str) else s[1].type for s in stack])
-            # show at most 15 tokens
-            input_ = "".join([t.value for t in tokens[pos:pos + 15]])
-
-            step = [stage, stack_, symbol_, input_]
+            if self.show_parsing_steps:
+                stack_ = " ".join([str(s[0]) for s in stack])
+                symbol_ = " ".join([s[1] if isinstance(s[1], str) else s[1].type for s in stack])
+                # show at most 15 tokens
+                input_ = "".join([t.value for t in tokens[pos:pos + 15]])
+                step = [stage, stack_, symbol_, input_]
+            else:
+                # rendering the stack on every step is quadratic, only do it when the steps are shown
+                step = []
             state = stack[-1]
             key = (state[0], word[0])
-            if self.parsing_table[key][0] == 'r':
-                g = self.parsing_table[key][1]
+            action = self.parsing_table.get(key, None)
+            if action is None or action[0] not in ('r', 's', 'acc'):
+                if not recover:
+                    raise AssertionError(f"Parse failed, {self.syntax_error(pos, word, state[0])}")
+                if error_pos != pos:
+                    self.errors.append(self.syntax_error(pos, word, state[0]))
+                    pos = self.recover_error(stack, value_stack, tokens, pos)
+                elif word[0] != self.eof:
+                    # failed again right after recovering, discard the token
+                    pos = self.recover_error(stack, value_stack, tokens, pos + 1)
+                else:
+                    pos = -1
+                step.append(f"error, recover at {pos}" if pos != -1 else "error, abort")
+                steps.append(step)
+                if pos == -1:
+                    break
+                error_pos = pos
+                word = tokens[pos]
+                continue
+            if action[0] == 'r':
+                g = action[1]
                 lhs, rhs = self.grammar_list[g][0], self.grammar_list[g][1]
                 values = []
                 for _ in range(len(rhs)):
                     stack.pop()
                     values.append(value_stack.pop())
                 values.reverse()
-                semantic_action = self.semantic_action[g]
-                if semantic_action:
-                    semantic_action = semantic_action.strip()[1:-1].strip()
+                value_stack.append(self.run_semantic_action(g, values))
+                r = action
+                bypass = self.unit_goto_table.get((stack[-1][0], lhs, word[0]), None)
+                if bypass:
+                    goto_state, goto_lhs, skipped = bypass
+                    self.unit_reductions_skipped += skipped
+                    step.append(f"{r[0]}{r[1]}: reduce by {lhs} -> {' '.join(rhs)},"
+                                f"goto {goto_state} (skip {skipped} unit reductions to {goto_lhs})")
                 else:
-                    semantic_action = """result={}"""
-                params = {
-                    "result": None,
-                }
-                for index, v in enumerate(values):
-                    params[f"p{index + 1}"] = v.value if isinstance(v, Token) else v
-                exec(semantic_action, params)
-                value_stack.append(params.get("result"))
-                goto_state = self.parsing_table[(stack[-1][0], lhs)]
-                new_state = (goto_state, lhs)
-                stack.append(new_state)
-                r = self.parsing_table[key]
-                step.append(f"{r[0]}{r[1]}: reduce by {lhs} -> {' '.join(rhs)},goto {goto_state}")
+                    goto_state, goto_lhs = self.parsing_table[(stack[-1][0], lhs)], lhs
+                    step.append(f"{r[0]}{r[1]}: reduce by {lhs} -> {' '.join(rhs)},goto {goto_state}")
+                stack.append((goto_state, goto_lhs))
                 steps.append(step)
-            elif self.parsing_table[key][0] == 's':
-                goto_state = self.parsing_table[key][1]
+            elif action[0] == 's':
+                goto_state = action[1]
                 stack.append((goto_state, word))
                 value_stack.append(word)
-                s = self.parsing_table[key]
+                s = action
                 step.append(f'{s[0]}{s[1]}: shift {word.type},goto {goto_state}')
                 steps.append(step)
                 pos += 1
                 word = tokens[pos]
-            elif self.parsing_table[key][0] == 'acc':
+            else:
                 step.append('accept')
                 steps.append(step)
                 break
-            else:
-                raise AssertionError("Parse failed")
 
         if self.show_parsing_steps:
             self.print_parsing_steps(steps)
+        if self.errors:
+            print('\n'.join(str(e) for e in self.errors))
 
-        self.ast = value_stack.pop()
+        self.ast = value_stack.pop() if value_stack else None
         if self.print_ast:
+            import jsbeautifier
+
             print("AST:")
             opts = jsbeautifier.default_options()
             opts.indent_size = 2
-            print(jsbeautifier.beautify(json.dumps(self.ast), opts))
+            print(jsbeautifier.beautify(json.dumps(self.ast, default=json_default), opts))
+
+    def run_semantic_action(self, g: int, values: list):
+        """
+        execute the semantic action of production g. p1...pn are the values of the rhs symbols, tokens are replaced by
+        their text.
+        """
+        return run_semantic_action(self.semantic_action[g], values, self.node_factory)
+
+    def recognize(self, tokens: list[Token]) -> int:
+        """
+        只判断输入是否能被文法接受，不维护 value stack，不执行语义动作，也不输出任何东西。
+        使用和 parse 相同的 ACTION/GOTO 表，只保存状态栈。
+
+        :param tokens:
+        :return: -1 if the input is accepted, otherwise the index of the token where parsing fails
+        """
+        action_table = self.action_table
+        goto_table = self.goto_table
+        grammar_list = self.grammar_list
+        stack = [0]
+        pos = 0
+        word = tokens[0].type
+        while True:
+            action = action_table.get((stack[-1], word), None)
+            if action is None:
+                return pos
+            if action[0] == 's':
+                stack.append(action[1])
+                pos += 1
+                word = tokens[pos].type
+            elif action[0] == 'r':
+                lhs, rhs = grammar_list[action[1]]
+                del stack[len(stack) - len(rhs):]
+                stack.append(goto_table[(stack[-1], lhs)])
+            elif action[0] == 'acc':
+                return -1
+            else:
+                return pos
+
+    def reduction_events(self, tokens: list[Token]):
+        """
+        SAX 风格的解析：不执行语义动作，也不构造整棵 AST，每次归约时产生一个事件
+        (production_id, (start, end), child_values)，span 是归约覆盖的 token 区间 [start, end)。
+        终结符的 child value 是 Token，非终结符的 child value 是调用者通过 send() 传回的值(直接迭代时为 None)，
+        所以内存只和栈深度相关，调用者自己决定保留什么。
+
+            events = parser.reduction_events(tokens)
+            for production_id, span, children in events:
+                ...
+
+        :param tokens:
+        :return: the value of the start symbol (StopIteration.value)
+        """
+        action_table = self.action_table
+        goto_table = self.goto_table
+        grammar_list = self.grammar_list
+        states = [0]
+        values = [None]
+        starts = [0]
+        pos = 0
+        word = tokens[0]
+        while True:
+            action = action_table.get((states[-1], word.type), None)
+            if action is None or action[0] not in ('r', 's', 'acc'):
+                raise AssertionError(f"Parse failed, {self.syntax_error(pos, word, states[-1])}")
+            if action[0] == 's':
+                states.append(action[1])
+                values.append(word)
+                starts.append(pos)
+                pos += 1
+                word = tokens[pos]
+            elif action[0] == 'r':
+                lhs, rhs = grammar_list[action[1]]
+                n = len(rhs)
+                start = starts[-n] if n else pos
+                children = values[len(values) - n:]
+                del states[len(states) - n:]
+                del values[len(values) - n:]
+                del starts[len(starts) - n:]
+                value = yield action[1], (start, pos), children
+                states.append(goto_table[(states[-1], lhs)])
+                values.append(value)
+                starts.append(start)
+            else:
+                return values[-1]
+
+    def parse_events(self, tokens: list[Token], callback):
+        """
+        drive reduction_events with a callback. callback(production_id, span, child_values) is called on every
+        reduction and its return value becomes the child value of the reduced non-terminal.
+
+        :return: the callback result of the start symbol
+        """
+        events = self.reduction_events(tokens)
+        try:
+            event = next(events)
+            while True:
+                event = events.send(callback(*event))
+        except StopIteration as stop:
+            return stop.value
+
+    def syntax_error(self, pos: int, word: Token, state: int) -> ParseError:
+        expected = [t for t in list(self.terminals) + [self.eof]
+                    if t != self.error_symbol and (state, t) in self.action_table]
+        return ParseError(pos, word, state, sorted(expected))
+
+    def recover_error(self, stack: list, value_stack: list, tokens: list[Token], pos: int) -> int:
+        """
+        错误恢复，每个输入 token 最多被丢弃一次，每个状态最多被弹出一次，所以整个解析依然是线性的。
+
+        1. 如果文法中有 error 产生式(yacc 风格，例如 S -> error ;)，从栈顶开始弹出状态，直到遇到一个能移入 error 的状态，
+        移入 error，然后丢弃输入，直到当前 token 在新状态下有动作。
+        2. 否则使用 panic mode：丢弃输入直到遇到同步 token (%sync 声明)，再弹出状态直到某个状态能处理这个同步 token。
+
+        :return: the position to continue parsing at, -1 if the parser can't recover
+        """
+        action_table = self.action_table
+        if self.error_symbol in self.terminals:
+            depth = len(stack) - 1
+            while depth >= 0 and action_table.get((stack[depth][0], self.error_symbol), ('',))[0] != 's':
+                depth -= 1
+            if depth >= 0:
+                del stack[depth + 1:]
+                del value_stack[depth:]
+                error_token = Token(self.error_symbol, None)
+                error_state = action_table[(stack[-1][0], self.error_symbol)][1]
+                stack.append((error_state, error_token))
+                value_stack.append(error_token)
+                while tokens[pos][0] != self.eof and (error_state, tokens[pos][0]) not in action_table:
+                    pos += 1
+                return pos if (error_state, tokens[pos][0]) in action_table else -1
+
+        while True:
+            while tokens[pos][0] != self.eof and tokens[pos][0] not in self.sync_tokens:
+                pos += 1
+            depth = len(stack) - 1
+            while depth >= 0 and (stack[depth][0], tokens[pos][0]) not in action_table:
+                depth -= 1
+            if depth >= 0:
+                del stack[depth + 1:]
+                del value_stack[depth:]
+                return pos
+            if tokens[pos][0] == self.eof:
+                return -1
+            pos += 1
 
     def print_parsing_steps(self, steps: list):
+        from prettytable import PrettyTable
+
         x = PrettyTable()
         x.title = 'Parsing Steps'
         x.field_names = ['STAGE', 'STACK', 'SYMBOLS', 'INPUT', 'ACTION']
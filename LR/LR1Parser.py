@@ -1,7 +1,5 @@
 import copy
 
-from graphviz import Digraph
-
 from LR.LR0Parser import LR0Parser, Item0, LRState
 
 
@@ -41,8 +39,8 @@ class Item1(Item0):
 
 
 class LR1Parser(LR0Parser):
-    def __init__(self, bnf_file: str, eof: str = '$'):
-        super().__init__(bnf_file, eof)
+    def __init__(self, bnf_file: str, eof: str = '$', **kwargs):
+        super().__init__(bnf_file, eof, **kwargs)
 
     def augment_grammar(self):
         old_start = self.bnf_builder.start_symbol
@@ -51,7 +49,7 @@ class LR1Parser(LR0Parser):
         self.non_terminals.add(new_start)
         self.start_symbol = new_start
         self.first_set[new_start] = self.first_set[old_start]
-        self.follow_set[new_start] = set(self.eof)
+        self.follow_set[new_start] = {self.eof}
         self.init_state = LRState(0, (self.closure([Item1(f"{new_start}", (old_start,), 0, self.eof)])))
         self.grammar_list.insert(0, (new_start, (old_start,)))
         self.semantic_action.insert(0, None)
@@ -80,9 +78,8 @@ class LR1Parser(LR0Parser):
             for item in result:
                 next_i = item.peek_dot_right()
                 if self.is_non_terminal(next_i):
+                    first = self.get_first(item.after_dot_next())
                     for rule in self.grammar[next_i]:
-                        after_next = item.after_dot_next()
-                        first = self.get_first(after_next)
                         for f in first:
                             i = Item1(next_i, rule, 0, f)
                             if i not in result:
@@ -97,22 +94,15 @@ class LR1Parser(LR0Parser):
         return result
 
     def get_first(self, symbols: list[str]) -> set[str]:
-        first_set = set()
-        for s in symbols:
-            first = self.first_set.get(s, set(s))
-            if self.epsilon not in first:
-                first_set |= first
-                return first_set
-            else:
-                first_set |= first
-                first_set.remove(self.epsilon)
-
-        return first_set
+        first, _ = self.ir.sequence_first(self.ir.symbol_id[s] for s in symbols if s != self.epsilon)
+        return self.ir.names(first)
 
     def lookahead_symbols(self, item: [Item1]):
         return [item.lookahead]
 
     def graph_state(self, states: list[LRState], trans: dict[tuple:int], acton_table: dict):
+        from graphviz import Digraph
+
         dot = Digraph("state transaction", node_attr={'shape': 'box'}, engine='neato')
         # dot.attr(rankdir='LR')
         # dot.attr(splines='ortho')
@@ -139,7 +129,7 @@ class LR1Parser(LR0Parser):
                 k.insert(i.pos, ' . ')
                 k = f"{i.lhs} -> {''.join(k)}"
                 if k not in items_dict:
-                    items_dict[k] = set(i.lookahead)
+                    items_dict[k] = {i.lookahead}
                 else:
                     items_dict[k].add(i.lookahead)
 
@@ -0,0 +1,142 @@
+import textwrap
+
+from LR.LR0Parser import LR0Parser
+
+
+class RecursiveAscentGenerator:
+    """
+    Generate a recursive ascent parser(python source) from the automaton of a LR parser, usually LALR1Parser.
+
+    Every LR state becomes a method _s{n}(self, _ra_v), _ra_v is the value of the symbol that leads to the state.
+    Shifts call the method of the next state, a reduce by A -> X1...Xk returns (k - 1, production, [_ra_v]) and each
+    returning frame adds its value, until the frame of the exposed state (count 0) runs the inlined semantic action and
+    calls the method of its GOTO state. The call stack is the parse stack, so there are no table lookups at runtime.
+    The locals of the generated code start with _ra_, the actions are free to use any other name.
+
+    The generated module only imports LR.AstNode when the actions use node(...).
+    """
+
+    def __init__(self, parser: LR0Parser):
+        if parser.action_table is None:
+            raise AssertionError('build parse table before generating the recursive ascent parser')
+        self.parser = parser
+        self.lines = []
+
+    def emit(self, indent: int, line: str = ''):
+        self.lines.append('    ' * indent + line if line else '')
+
+    def generate(self) -> str:
+        parser = self.parser
+        self.lines = []
+        uses_node = any(a and 'node(' in a for a in parser.semantic_action)
+        self.emit(0, f'# Recursive ascent parser generated from {parser.bnf_file} by LR.RecursiveAscent.')
+        self.emit(0, '# Do not edit.')
+        if uses_node:
+            self.emit(0, 'from LR.AstNode import NodeFactory')
+            self.emit(0)
+            self.emit(0, 'node = NodeFactory()')
+        self.emit(0)
+        self.emit(0)
+        self.emit(0, 'class Parser:')
+        self.emit(1, 'def __init__(self, tokens: list):')
+        self.emit(2, 'self.tokens = tokens')
+        self.emit(2, 'self.pos = 0')
+        self.emit(2, 'self.token = tokens[0]')
+        self.emit(0)
+        self.emit(1, 'def parse(self):')
+        self.emit(2, '_ra_r, _ra_goto, value = self._s0(None)')
+        self.emit(2, 'return value')
+        self.emit(0)
+        self.emit(1, 'def error(self, state: int, expected: tuple):')
+        self.emit(2, 'raise AssertionError(f"Parse failed, syntax error at token {self.pos}: unexpected "')
+        self.emit(2, '                     f"{self.token.type} \'{self.token.value}\', expected one of {\' \'.join(expected)}")')
+        for state in sorted(parser.lr0_states, key=lambda s: s.name):
+            self.emit(0)
+            self.state_method(state.name)
+        self.emit(0)
+        self.emit(0)
+        self.emit(0, 'def parse(tokens: list):')
+        self.emit(1, 'return Parser(tokens).parse()')
+        return '\n'.join(self.lines) + '\n'
+
+    def write(self, path: str):
+        with open(path, 'w') as f:
+            f.write(self.generate())
+
+    def state_method(self, state: int):
+        parser = self.parser
+        shifts, reduces, accept = {}, {}, []
+        for (s, terminal), action in parser.action_table.items():
+            if s != state:
+                continue
+            if isinstance(action, list):
+                raise AssertionError(f'parsing table conflict in state {state} on {terminal}')
+            if action[0] == 's':
+                shifts.setdefault(action[1], []).append(terminal)
+            elif action[0] == 'r':
+                reduces.setdefault(action[1], []).append(terminal)
+            else:
+                accept.append(terminal)
+        gotos = {nt: target for (s, nt), target in parser.goto_table.items() if s == state}
+        expected = tuple(sorted(t for ts in list(shifts.values()) + list(reduces.values()) for t in ts) + accept)
+
+        self.emit(1, f'def _s{state}(self, _ra_v):')
+        self.emit(2, 'match self.token.type:')
+        for target, terminals in sorted(shifts.items()):
+            self.emit(3, f'case {self.pattern(terminals)}:')
+            self.emit(4, '_ra_tok = self.token')
+            self.emit(4, 'self.pos += 1')
+            self.emit(4, 'self.token = self.tokens[self.pos]')
+            self.emit(4, f'_ra_r, _ra_goto, _ra_vals = self._s{target}(_ra_tok)')
+        for g, terminals in sorted(reduces.items()):
+            length = len(parser.grammar_list[g][1])
+            self.emit(3, f'case {self.pattern(terminals)}:')
+            if length == 0:
+                self.emit(4, f'_ra_r, _ra_goto, _ra_vals = 0, {g}, []')
+            else:
+                self.emit(4, f'return {length - 1}, {g}, [_ra_v]')
+        if accept:
+            self.emit(3, f'case {self.pattern(accept)}:')
+            self.emit(4, 'return -1, 0, _ra_v')
+        self.emit(3, 'case _:')
+        self.emit(4, f'self.error({state}, {expected!r})')
+        self.emit(2, 'while True:')
+        self.emit(3, 'if _ra_r:')
+        self.emit(4, 'if _ra_r < 0:')
+        self.emit(5, 'return _ra_r, _ra_goto, _ra_vals')
+        self.emit(4, '_ra_vals.append(_ra_v)')
+        self.emit(4, 'return _ra_r - 1, _ra_goto, _ra_vals')
+        productions = [g for g, (lhs, _) in enumerate(parser.grammar_list) if lhs in gotos]
+        if not productions:
+            self.emit(3, f'self.error({state}, {expected!r})')
+            return
+        self.emit(3, 'match _ra_goto:')
+        for g in productions:
+            lhs, rhs = parser.grammar_list[g]
+            self.emit(4, f'case {g}:')
+            self.inline_action(g, rhs, 5)
+            self.emit(5, f'_ra_r, _ra_goto, _ra_vals = self._s{gotos[lhs]}(result)')
+
+    def inline_action(self, g: int, rhs: tuple, indent: int):
+        """
+        values arrive in reverse order, bind them to p1...pn (text for tokens) and inline the semantic action.
+        """
+        names = [f'p{i + 1}' for i in range(len(rhs))]
+        if names:
+            self.emit(indent, f"{', '.join(reversed(names))}{',' if len(names) == 1 else ''} = _ra_vals")
+        for name, symbol in zip(names, rhs):
+            if self.parser.is_terminal(symbol):
+                self.emit(indent, f'{name} = {name}.value')
+        semantic_action = self.parser.semantic_action[g]
+        code = semantic_action.strip()[1:-1] if semantic_action else 'result={}'
+        code = textwrap.dedent(code.strip('\n'))
+        lines = [line for line in code.splitlines() if line.strip()]
+        # the first line of an action may not share the indentation of the others
+        if len(lines) > 1 and lines[0] == lines[0].lstrip():
+            lines = [lines[0]] + textwrap.dedent('\n'.join(lines[1:])).splitlines()
+        for line in lines:
+            self.emit(indent, line.rstrip())
+
+    @staticmethod
+    def pattern(terminals: list[str]) -> str:
+        return ' | '.join(repr(t) for t in sorted(terminals))
@@ -45,7 +45,7 @@ class Parser:
             ;
         :return:
         """
-        token_type = self._lookahead.get('type')
+        token_type = self._lookahead.type
         if token_type == 'NUMBER':
             return self.numeric_literal()
         elif token_type == 'STRING':
@@ -63,7 +63,7 @@ class Parser:
         token = self._eat('STRING')
         return {
             "type": "StringLiteral",
-            "value": token.get('value')[1:-1]
+            "value": token.value[1:-1]
         }
 
     def numeric_literal(self):
@@ -76,7 +76,7 @@ class Parser:
         token = self._eat('NUMBER')
         return {
             "type": "NumericLiteral",
-            "value": number(token.get('value'))
+            "value": number(token.value)
         }
 
     # Expects a token from given type
@@ -84,8 +84,8 @@ class Parser:
         token = self._lookahead
         if token is None:
             raise SyntaxError(f'Unexpected end of input,expected: {token_type}')
-        if token.get('type') != token_type:
-            raise SyntaxError(f'Unexpected token:{token.get("value")},expected:{token_type}')
+        if token.type != token_type:
+            raise SyntaxError(f'Unexpected token:{token.value},expected:{token_type}')
 
         # Advance to next token
         self._lookahead = self._tokenizer.get_next_token()
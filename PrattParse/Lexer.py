@@ -1,4 +1,30 @@
+import re
+
 from PrattParse.Token import TokenType, Token
+from util.Lexer import Source
+
+# Register all of the TokenTypes that are explicit punctuators.
+punctuators: dict[str, TokenType] = {_type.punctuator(): _type for _type in TokenType if _type.punctuator() is not None}
+
+# A name or a punctuator, whatever comes first. Everything in between is skipped by search(). [^\W\d_] also takes
+# characters like '²' or '½' that are not isalpha(), a name is only the isalpha() runs of the match.
+_token_regex = re.compile(r'([^\W\d_]+)|([' + ''.join(re.escape(p) for p in punctuators) + '])')
+
+
+def _alpha_runs(text: str, start: int, end: int):
+    """
+    (start, end) of the runs of isalpha() characters in text[start:end]
+    """
+    run = None
+    for i in range(start, end):
+        if text[i].isalpha():
+            if run is None:
+                run = i
+        elif run is not None:
+            yield run, i
+            run = None
+    if run is not None:
+        yield run, end
 
 
 class Lexer:
@@ -16,27 +42,44 @@ class Lexer:
     def __init__(self, source: str):
         self.index = 0
         self.source = source
-        # Register all of the TokenTypes that are explicit punctuators.
-        self.punctuators: dict[str, TokenType] = {}
-        for _type in TokenType:
-            p = _type.punctuator()
-            if p is not None:
-                self.punctuators[p] = _type
+        # tokens keep offsets into it, their text is sliced on access
+        self._source = Source(source)
+        self.punctuators: dict[str, TokenType] = punctuators
 
     def next(self) -> Token:
-        while self.index < len(self.source):
-            c = self.source[self.index]
-            self.index += 1
-            if c in self.punctuators:
+        while True:
+            m = _token_regex.search(self.source, self.index)
+            if m is None:
+                self.index = len(self.source)
+                return Token(TokenType.EOF, "")
+            if m.lastindex == 2:
                 # punctuations
-                return Token(self.punctuators[c], c)
-            if c.isalpha():
-                # names
-                start = self.index - 1
-                while self.index < len(self.source) and self.source[self.index].isalpha():
-                    self.index += 1
-
-                name = self.source[start:self.index]
-                return Token(TokenType.NAME, name)
-            # Ignore all other characters (whitespace, etc.)
-        return Token(TokenType.EOF, "")
+                self.index = m.end()
+                return Token(punctuators[m.group()], source=self._source, start=m.start(), end=m.end())
+            # names
+            if m.group().isalpha():
+                self.index = m.end()
+                return Token(TokenType.NAME, source=self._source, start=m.start(), end=m.end())
+            for start, end in _alpha_runs(self.source, m.start(), m.end()):
+                self.index = end
+                return Token(TokenType.NAME, source=self._source, start=start, end=end)
+            self.index = m.end()
+
+    def tokenize(self) -> list[Token]:
+        """
+        All the remaining tokens in one pass, ending with the EOF token.
+        """
+        tokens = []
+        append, source = tokens.append, self._source
+        for m in _token_regex.finditer(self.source, self.index):
+            if m.lastindex == 2:
+                append(Token(punctuators[m.group()], source=source, start=m.start(), end=m.end()))
+                continue
+            if m.group().isalpha():
+                append(Token(TokenType.NAME, source=source, start=m.start(), end=m.end()))
+            else:
+                for start, end in _alpha_runs(self.source, m.start(), m.end()):
+                    append(Token(TokenType.NAME, source=source, start=start, end=end))
+        self.index = len(self.source)
+        append(Token(TokenType.EOF, ""))
+        return tokens
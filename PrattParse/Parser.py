@@ -6,6 +6,7 @@ from PrattParse import Lexer
 from PrattParse.Expression import Expression
 from PrattParse.Precedence import Precedence
 from PrattParse.Token import Token, TokenType
+from util.TokenStream import TokenStream
 
 
 class PrefixParselet(ABC):
@@ -47,7 +48,7 @@ class InfixParselet(ABC):
 class Parser:
     def __init__(self, lexer: Lexer):
         self.lexer: Lexer = lexer
-        self.cached_token: list[Token] = []
+        self.tokens: TokenStream = TokenStream(lexer.next)
         self.prefix_parselets: dict[TokenType, PrefixParselet] = {}
         self.infix_parselets: dict[TokenType, InfixParselet] = {}
 
@@ -59,13 +60,10 @@ class Parser:
         return True
 
     def look_ahead(self, distance: int) -> Token:
-        while distance >= len(self.cached_token):
-            self.cached_token.append(self.lexer.next())
-        return self.cached_token[distance]
+        return self.tokens.look_ahead(distance)
 
     def _consume_0(self) -> Token:
-        self.look_ahead(0)
-        return self.cached_token.pop(0)
+        return self.tokens.consume()
 
     def consume(self, expected: TokenType | None = None) -> Token:
         if not expected:
@@ -1,5 +1,7 @@
 from enum import Enum
 
+from util.Lexer import Source, Token as SourceToken
+
 
 class TokenType(Enum):
     LEFT_PAREN = 'LEFT_PAREN'
@@ -44,11 +46,19 @@ _punctuators = {
 }
 
 
-class Token:
-    """A simple token class. These are generated by Lexer and consumed by Parser."""
-    def __init__(self, type_: TokenType, text: str):
-        self.type = type_
-        self.text = text
+class Token(SourceToken):
+    """A simple token class. These are generated by Lexer and consumed by Parser.
+
+    The text of a lexed token is sliced from the source when it is read, see util.Lexer.Token.
+    """
+    __slots__ = ()
+
+    def __init__(self, type_: TokenType, text: str = None, source: Source = None, start: int = -1, end: int = -1):
+        super().__init__(type_, text, source, start, end)
+
+    @property
+    def text(self):
+        return self.value
 
     def __str__(self):
         return f"[{self.text},{self.type}]"
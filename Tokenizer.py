@@ -2,46 +2,65 @@
 # Lazy pulls a token from a stream.
 import re
 
+from util.Lexer import Source, Token
+
 spec = [
     # white space
-    [r'^\s+', None],
+    [r'\s+', None],
     # comments,skip single line comments.
-    [r'^\/\/.*', None],
+    [r'\/\/.*', None],
     # skip multi line comments.
-    [r'^\/\*[\s\S]*?\*\/', None],
-    [r'^\d+', 'NUMBER'],
-    [r'^"[^"]*"|^\'[^\']*\'', 'STRING'],
+    [r'\/\*[\s\S]*?\*\/', None],
+    [r'\d+', 'NUMBER'],
+    [r'"[^"]*"|\'[^\']*\'', 'STRING'],
 ]
 
+# the patterns are matched at the cursor, no slicing of the rest of the string
+compiled_spec = [(re.compile(reg), token_type) for reg, token_type in spec]
+
 
 class Tokenizer:
     def __init__(self, string):
         self._string = string
         self._cursor = 0
+        # tokens keep offsets into it, their value is sliced on access
+        self._source = Source(string)
 
     def get_next_token(self):
         """
-        Obtain next token
-        :return:
+        Obtain next token, skipped tokens are consumed in a loop
+        :return: None at the end of the string
         """
-        if not self.has_more_tokens():
-            return None
+        string = self._string
+        while self.has_more_tokens():
+            start = self._cursor
+            for reg, token_type in compiled_spec:
+                m = reg.match(string, start)
+                # couldn't match rule,continue
+                if m is None:
+                    continue
+                self._cursor = m.end()
 
-        string = self._string[self._cursor:]
+                # should skip token. e.g white space
+                if token_type is None:
+                    break
 
-        for reg, token_type in spec:
-            token = self.match(reg, string)
-            # couldn't match rule,continue
-            if token is None:
-                continue
-
-            # should skip token. e.g white space
-            if token_type is None:
-                return self.get_next_token()
+                return Token(token_type, source=self._source, start=start, end=self._cursor)
+            else:
+                raise SyntaxError(f'Unexpected token:{string[self._cursor]}')
+        return None
 
-            return {"type": token_type, "value": token}
+    def tokens(self):
+        """
+        Generate the remaining tokens
+        """
+        token = self.get_next_token()
+        while token is not None:
+            yield token
+            token = self.get_next_token()
 
-        raise SyntaxError(f'Unexpected token:{string[0]}')
+    def __iter__(self):
+        return self.tokens()
 
     # Whether still have more tokens.
     def has_more_tokens(self):
@@ -50,10 +69,12 @@ class Tokenizer:
     def is_eof(self):
         return len(self._string) == self._cursor
 
-    def match(self, reg, string):
-        m = re.search(reg, string)
+    def match(self, reg):
+        """
+        Match a compiled pattern at the cursor and advance past it
+        """
+        m = reg.match(self._string, self._cursor)
         if m:
-            token = m.group()
-            self._cursor += len(token)
-            return token
+            self._cursor = m.end()
+            return m.group()
         return None
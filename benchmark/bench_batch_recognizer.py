@@ -0,0 +1,58 @@
+"""
+LR0Parser.recognize on every input vs BatchRecognizer on the whole batch.
+
+    python benchmark/bench_batch_recognizer.py [inputs]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from LR.BatchRecognizer import BatchRecognizer
+from LR.LALR1Parser import LALR1Parser
+from util.Lexer import Token
+
+GRAMMAR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test', 'g5.bnf')
+
+
+def short_expression(rnd: random.Random) -> list[Token]:
+    tokens = [Token('NUMBER', '1')]
+    for _ in range(rnd.randint(5, 15)):
+        op = rnd.choice('+-*/')
+        tokens += [Token(op, op), Token('NUMBER', '2')]
+    tokens.append(Token('$', '$'))
+    return tokens
+
+
+def main():
+    inputs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    parser = LALR1Parser(GRAMMAR, print_ast=False, show_parsing_table=False, show_graph_state=False,
+                         print_first_follow=False, show_parsing_steps=False)
+    parser.canonical_collection()
+    parser.build_parse_table()
+    recognizer = BatchRecognizer(parser)
+    rnd = random.Random(0)
+    batch = [short_expression(rnd) for _ in range(inputs)]
+
+    start = time.perf_counter()
+    expected = [parser.recognize(tokens) for tokens in batch]
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ids = recognizer.encode(batch)
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    accepted, error_pos = recognizer.recognize_ids(ids)
+    lock_step = time.perf_counter() - start
+
+    assert [int(p) for p in error_pos] == expected
+    print(f'{inputs} inputs, {sum(len(t) for t in batch)} tokens')
+    print(f'recognize() per input:  {single * 1000:9.1f} ms')
+    print(f'batch encode:           {encode * 1000:9.1f} ms')
+    print(f'batch lock-step:        {lock_step * 1000:9.1f} ms  ({single / lock_step:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
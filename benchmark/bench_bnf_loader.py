@@ -0,0 +1,62 @@
+"""
+BnfBuilder.build on a generated grammar, against splitting every line with shlex.split as the old loader did (only
+the splitting, without building the grammar).
+
+    python benchmark/bench_bnf_loader.py [productions]
+"""
+import os
+import shlex
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.BnfBuilder import BnfBuilder
+
+
+def shlex_lines(path: str):
+    with open(path) as file:
+        for line in file:
+            shlex.split(line)
+
+
+def generate_grammar(path: str, productions: int):
+    """
+    productions / 3 non-terminals with 3 alternatives each, every alternative has a multi-line dict action.
+    """
+    with open(path, 'w') as f:
+        f.write('%left + -\n%left * /\n\n')
+        for i in range(productions // 3):
+            nxt = f'N{i + 1}'
+            f.write(f'N{i} -> N{i} + {nxt}\n')
+            f.write('{\n    result = {\n      "type":"BinaryExpression",\n      "op":p2,\n'
+                    '      "left":p1,\n      "right":p3\n    }\n}\n')
+            f.write(f'  | ( N{i} ) {nxt}\n{{result=p2}}\n')
+            f.write(f'  | NUMBER\n{{\n    result = {{\n      "type":"NumericLiteral",\n      "value":p1\n    }}\n}}\n')
+
+
+def build(path: str):
+    BnfBuilder(path).build()
+
+
+def timed(load, path: str) -> float:
+    start = time.perf_counter()
+    load(path)
+    return time.perf_counter() - start
+
+
+def main():
+    productions = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    path = os.path.join(tempfile.mkdtemp(), 'generated.bnf')
+    generate_grammar(path, productions)
+    size = os.path.getsize(path)
+    old = min(timed(shlex_lines, path) for _ in range(3))
+    new = min(timed(build, path) for _ in range(3))
+    print(f'{productions} productions, {size / 1024:.0f} KB')
+    print(f'shlex per line: {old * 1000:8.1f} ms')
+    print(f'BnfBuilder:     {new * 1000:8.1f} ms  ({old / new:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
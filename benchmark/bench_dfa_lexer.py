@@ -0,0 +1,39 @@
+"""
+regex.DFALexer against util.Lexer on the generated program of bench_lexer.py. The DFA tables are built once
+(or loaded from the cache directory), the build time is reported separately.
+
+    python benchmark/bench_dfa_lexer.py [megabytes] [cache_dir]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.bench_lexer import generate_program, lex, token_exprs
+from regex.DFALexer import DFALexer
+from util.Lexer import Lexer
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    cache_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    text = generate_program(int(megabytes * 1024 * 1024))
+
+    start = time.perf_counter()
+    dfa_lexer = DFALexer(token_exprs, cache_dir=cache_dir)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    count = sum(1 for _ in dfa_lexer.scan(text))
+    dfa = time.perf_counter() - start
+    regex, regex_count = lex(Lexer, text)
+    assert count == regex_count
+    print(f'{len(text) / 1024 / 1024:.1f} MB, {count} tokens, {len(dfa_lexer.accept)} states, '
+          f'{len(dfa_lexer.points)} input classes, tables in {build:.3f} s')
+    print(f'master regex:  {regex:6.2f} s  {count / regex / 1000:8.0f} K tokens/s  {len(text) / regex / 1e6:6.2f} MB/s')
+    print(f'dfa:           {dfa:6.2f} s  {count / dfa / 1000:8.0f} K tokens/s  {len(text) / dfa / 1e6:6.2f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
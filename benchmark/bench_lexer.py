@@ -0,0 +1,98 @@
+"""
+util.Lexer on a generated arithmetic program, against the old lexer that compiled and tried every token expression
+one by one for each token.
+
+    python benchmark/bench_lexer.py [megabytes]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.Lexer import Lexer, Token
+
+token_exprs = [
+    (r'[ \n\t]+', None),
+    (r'#[^\n]*', None),
+    (r'[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?', 'NUMBER'),
+    (r'\(', '('),
+    (r'\)', ')'),
+    (r'\+', '+'),
+    (r'\-', '-'),
+    (r'\*', '*'),
+    (r'\/', '/'),
+    (r'[a-zA-Z_][a-zA-Z0-9_]*', 'IDENTIFIER'),
+]
+
+
+class PatternLoopLexer(Lexer):
+    """
+    the old matching loop, restarting from the first expression after a skip token so both lexers accept the same
+    input.
+    """
+
+    def _get_next_token(self):
+        while self.pos < len(self.input):
+            for pattern, tag in self.token_exprs:
+                regex = re.compile(pattern)
+                match = regex.match(self.input, self.pos)
+                if match:
+                    self.pos = match.end(0)
+                    if tag:
+                        return Token(tag, match.group(0))
+                    break
+            else:
+                raise ValueError('Illegal character: %s' % self.input[self.pos])
+        return None
+
+
+def generate_program(size: int) -> str:
+    rng = random.Random(0)
+    atoms = ['x', 'count', 'total_1', '42', '3.14', '1e9', '(a + b)']
+    lines = []
+    length = 0
+    while length < size:
+        line = ' '.join(rng.choice(atoms) + ' ' + rng.choice('+-*/') for _ in range(8)) + ' 1'
+        if rng.random() < 0.1:
+            line += '  # comment'
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines)
+
+
+def lex(cls, text: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    lexer = cls(text, token_exprs)
+    count = 0
+    while lexer.has_next():
+        lexer.next()
+        count += 1
+    return time.perf_counter() - start, count
+
+
+def lex_all(text: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    count = len(Lexer(text, token_exprs).tokenize_all())
+    return time.perf_counter() - start, count
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    text = generate_program(int(megabytes * 1024 * 1024))
+    old, old_count = lex(PatternLoopLexer, text)
+    new, count = lex(Lexer, text)
+    batch, batch_count = lex_all(text)
+    assert old_count == count == batch_count
+    print(f'{len(text) / 1024 / 1024:.1f} MB, {count} tokens')
+    print(f'pattern loop:  {old:6.2f} s  {count / old / 1000:8.0f} K tokens/s  {len(text) / old / 1e6:6.2f} MB/s')
+    print(f'master regex:  {new:6.2f} s  {count / new / 1000:8.0f} K tokens/s  {len(text) / new / 1e6:6.2f} MB/s'
+          f'  ({old / new:.1f}x)')
+    print(f'tokenize_all:  {batch:6.2f} s  {count / batch / 1000:8.0f} K tokens/s  {len(text) / batch / 1e6:6.2f} MB/s'
+          f'  ({old / batch:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Throughput and memory of the lexers of the project on generated inputs:
+
+    util.Lexer, regex.DFALexer   programs with identifiers, numbers, operators, strings and comments
+    Tokenizer                    numbers and strings between // and /* */ comments
+    PrattParse.Lexer             expressions with names and punctuators
+    regex.Scanner                regular expressions
+
+For every lexer and input size it reports tokens/s and bytes/s (best of --repeat runs), and with tracemalloc on a
+separate run the peak memory and the memory blocks still allocated per token while the tokens are alive. The report
+is written as json, --compare prints the bytes/s ratio against an older report.
+
+    python benchmark/bench_lexers.py [--sizes 1K 64K 1M 100M] [--output report.json] [--compare old.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PrattParse.Lexer import Lexer as PrattLexer
+from Tokenizer import Tokenizer
+from regex.DFALexer import DFALexer
+from regex.Scanner import Scanner
+from util.Lexer import Lexer
+
+token_exprs = [
+    (r'[ \n\t]+', None),
+    (r'#[^\n]*', None),
+    (r'[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?', 'NUMBER'),
+    (r'"([^"\\]|\\.)*"', 'STRING'),
+    (r'\(', '('),
+    (r'\)', ')'),
+    (r'\+', '+'),
+    (r'\-', '-'),
+    (r'\*', '*'),
+    (r'\/', '/'),
+    (r'=', '='),
+    (r'[a-zA-Z_][a-zA-Z0-9_]*', 'IDENTIFIER'),
+]
+
+# input name -> pieces the input is generated from, joined with the separator
+corpora = {
+    'program': ([' x', ' count', ' total_1', ' 42', ' 3.14', ' 1e9', ' (a + b)', ' +', ' -', ' *', ' /', ' =',
+                 ' "hello world"', ' "esc \\" q"', '  # comment\n', '\n'], ''),
+    'literals': (['42', '7', '"text"', "'quoted string'", '// line comment\n', '/* block\n comment */', '\n', '123456'],
+                 ' '),
+    'expression': (['a', 'bb', 'ccc', '+', '-', '*', '/', '^', '!', '~', '?', ':', '=', '(', ')', ','], ' '),
+    'regex': (['(a|b)*', '[0-9]+', '\\d{2,3}', '[a-zA-Z_]\\w*', '(?:x|y)?', '.+?', '[^"\\\\]', '\\n', 'abc'], ''),
+}
+
+
+def generate(corpus: str, size: int) -> str:
+    pieces, separator = corpora[corpus]
+    rng = random.Random(size)
+    chunk = []
+    length = 0
+    while length < size:
+        piece = rng.choice(pieces)
+        chunk.append(piece)
+        length += len(piece) + len(separator)
+    return separator.join(chunk)
+
+
+def lexers() -> list[tuple]:
+    """
+    (lexer name, input name, function from text to token list)
+    """
+    dfa_lexer = DFALexer(token_exprs)
+    return [
+        ('util.Lexer', 'program', lambda text: Lexer(text, token_exprs).tokenize_all()),
+        ('regex.DFALexer', 'program', dfa_lexer.tokenize),
+        ('Tokenizer', 'literals', lambda text: list(Tokenizer(text))),
+        ('PrattParse.Lexer', 'expression', lambda text: PrattLexer(text).tokenize()),
+        ('regex.Scanner', 'regex', lambda text: Scanner(text).scan_tokens()),
+    ]
+
+
+def parse_size(size: str) -> int:
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    if size[-1].upper() in units:
+        return int(float(size[:-1]) * units[size[-1].upper()])
+    return int(size)
+
+
+def measure(run, text: str, repeat: int, memory: bool) -> dict:
+    seconds = float('inf')
+    tokens = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = len(run(text))
+        seconds = min(seconds, time.perf_counter() - start)
+    size = len(text.encode('utf-8'))
+    result = {
+        'bytes': size,
+        'tokens': tokens,
+        'seconds': seconds,
+        'tokens_per_s': tokens / seconds,
+        'bytes_per_s': size / seconds,
+    }
+    if memory:
+        tracemalloc.start()
+        kept = run(text)
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        blocks = sum(stat.count for stat in snapshot.statistics('filename'))
+        result.update({
+            'peak_bytes': peak,
+            'peak_bytes_per_token': peak / max(len(kept), 1),
+            'live_blocks_per_token': blocks / max(len(kept), 1),
+        })
+        del kept, snapshot
+    return result
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, old_report: dict):
+    old = {(r['lexer'], r['bytes']): r for r in old_report['results']}
+    print(f'against {old_report["meta"].get("commit")}')
+    for r in report['results']:
+        before = old.get((r['lexer'], r['bytes']))
+        if before:
+            print(f'{r["lexer"]:18} {r["bytes"]:>11}  {r["bytes_per_s"] / before["bytes_per_s"]:6.2f}x bytes/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark the lexers')
+    parser.add_argument('--sizes', nargs='+', default=['1K', '64K', '1M'], help='input sizes, like 1K 64K 1M 100M')
+    parser.add_argument('--lexers', nargs='+', help='only these lexers')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per input, the best one is reported')
+    parser.add_argument('--memory-limit', default='1M', help='largest input measured with tracemalloc')
+    parser.add_argument('--output', help='json report path')
+    parser.add_argument('--compare', help='older json report to compare with')
+    args = parser.parse_args()
+    memory_limit = parse_size(args.memory_limit)
+
+    results = []
+    for name, corpus, run in lexers():
+        if args.lexers and name not in args.lexers:
+            continue
+        for size in map(parse_size, args.sizes):
+            text = generate(corpus, size)
+            result = measure(run, text, args.repeat if size < 1 << 24 else 1, size <= memory_limit)
+            results.append({'lexer': name, 'input': corpus, **result})
+            memory = ''
+            if 'peak_bytes' in result:
+                memory = (f'  peak {result["peak_bytes"] / 1e6:8.2f} MB  {result["peak_bytes_per_token"]:6.0f} B/token'
+                          f'  {result["live_blocks_per_token"]:5.2f} blocks/token')
+            print(f'{name:18} {result["bytes"]:>11} B  {result["tokens"]:>10} tokens  '
+                  f'{result["tokens_per_s"] / 1e3:9.0f} K tokens/s  {result["bytes_per_s"] / 1e6:7.2f} MB/s{memory}')
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
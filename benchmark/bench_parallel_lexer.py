@@ -0,0 +1,37 @@
+"""
+util.ParallelLexer.tokenize_parallel against Lexer.tokenize_all on the generated program of bench_lexer.py. The
+parallel result is a TokenBuffer, its Tokens are only made when they are read.
+
+    python benchmark/bench_parallel_lexer.py [megabytes] [processes]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.bench_lexer import generate_program, token_exprs
+from util.Lexer import Lexer
+from util.ParallelLexer import tokenize_parallel
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 16
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    text = generate_program(int(megabytes * 1024 * 1024))
+
+    start = time.perf_counter()
+    count = len(Lexer(text, token_exprs).tokenize_all())
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel_count = len(tokenize_parallel(text, token_exprs, processes, chunk_size=len(text) // processes + 1))
+    parallel = time.perf_counter() - start
+    assert count == parallel_count
+    print(f'{len(text) / 1024 / 1024:.1f} MB, {count} tokens, {processes} processes')
+    print(f'tokenize_all:  {sequential:6.2f} s  {len(text) / sequential / 1e6:6.2f} MB/s')
+    print(f'parallel:      {parallel:6.2f} s  {len(text) / parallel / 1e6:6.2f} MB/s  ({sequential / parallel:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Table driven LALR(1) parsing vs the generated recursive ascent parser on the same tokens.
+
+    python benchmark/bench_recursive_ascent.py [operands]
+"""
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from LR.LALR1Parser import LALR1Parser
+from LR.RecursiveAscent import RecursiveAscentGenerator
+from util.Lexer import Token
+
+GRAMMAR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test', 'g5.bnf')
+
+
+def expression_tokens(operands: int, seed: int = 0) -> list[Token]:
+    rnd = random.Random(seed)
+    tokens = [Token('NUMBER', '1')]
+    for _ in range(operands - 1):
+        op = rnd.choice('+-*/')
+        tokens.append(Token(op, op))
+        if rnd.random() < 0.2:
+            tokens += [Token('(', '('), Token('NUMBER', '2'), Token('+', '+'), Token('NUMBER', '3'), Token(')', ')')]
+        else:
+            tokens.append(Token('NUMBER', str(rnd.randint(0, 99))))
+    tokens.append(Token('$', '$'))
+    return tokens
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    operands = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    parser = LALR1Parser(GRAMMAR, print_ast=False, show_parsing_table=False, show_graph_state=False,
+                         print_first_follow=False, show_parsing_steps=False)
+    parser.canonical_collection()
+    parser.build_parse_table()
+    path = os.path.join(tempfile.mkdtemp(), 'g5_parser.py')
+    RecursiveAscentGenerator(parser).write(path)
+    spec = importlib.util.spec_from_file_location('g5_parser', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    tokens = expression_tokens(operands)
+    table = best_of(3, lambda: parser.parse(tokens))
+    events = best_of(3, lambda: sum(1 for _ in parser.reduction_events(tokens)))
+    generated = best_of(3, lambda: module.parse(tokens))
+    print(f'{len(tokens)} tokens')
+    print(f'table driven parse():        {table * 1000:9.1f} ms')
+    print(f'table driven, no actions:    {events * 1000:9.1f} ms')
+    print(f'recursive ascent (generated): {generated * 1000:8.1f} ms  ({table / generated:.1f}x parse())')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+import bisect
+import hashlib
+import json
+import os
+
+from regex.EngineNFA import EngineNFA
+from regex.Interpreter import Interpreter
+from regex.NFAMatcher import CharacterMatcher, ComplexMatcher, CustomMatcher, EpsilonMatcher, \
+    IndividualCharMatcher, RangeMatcher
+from regex.Parser import Parser
+from regex.Resolver import Resolver
+from regex.Scanner import Scanner
+from util.Lexer import Source, Token
+
+MAX_CODE_POINT = 0x110000
+# bump when the table format changes, old cache files are ignored
+TABLE_VERSION = 1
+
+
+def build_nfa(pattern: str) -> EngineNFA:
+    ast = Parser(Scanner(pattern).scan_tokens()).parse()
+    if not ast:
+        raise ValueError("empty token expression")
+    interpreter = Interpreter(ast)
+    Resolver(interpreter)
+    return interpreter.build_nfa()
+
+
+def boundaries(matcher) -> set[int]:
+    """
+    code points where the result of the matcher may change
+    """
+    if isinstance(matcher, CharacterMatcher):
+        return {ord(matcher.c), ord(matcher.c) + 1}
+    if isinstance(matcher, CustomMatcher):
+        return boundaries(matcher.matcher)
+    if isinstance(matcher, RangeMatcher):
+        return {ord(matcher.start), ord(matcher.end) + 1}
+    if isinstance(matcher, IndividualCharMatcher):
+        return {p for c in matcher.chars for p in (ord(c), ord(c) + 1)}
+    if isinstance(matcher, ComplexMatcher):
+        return set().union(*(boundaries(m) for m in matcher.matchers))
+    return set()
+
+
+class DFALexer:
+    """
+    Table driven lexer generated from (pattern, tag) token expressions, the same ones util.Lexer takes. Tokens with
+    tag None are skipped.
+
+    1. every pattern is parsed by regex.Scanner/regex.Parser and turned into a NFA by regex.Interpreter.
+    2. the code points are split into intervals on which every matcher of every NFA gives the same answer, each
+       interval is one input class of the DFA.
+    3. subset construction over the union of the NFAs, then Hopcroft minimization. A DFA state accepts the first
+       token expression of the NFA states it contains.
+    4. scanning takes the longest match, ties go to the earlier expression (lex rules, util.Lexer takes the first
+       expression that matches instead). Empty matches are not tokens.
+
+    Only plain regular patterns are supported: anchors, back references and {n,m} raise ValueError.
+    The tables can be cached in cache_dir, keyed by the token expressions.
+    """
+
+    def __init__(self, token_exprs: list[tuple], cache_dir: str = None):
+        self.token_exprs = [tuple(e) for e in token_exprs]
+        self.tags = [tag for _, tag in self.token_exprs]
+        # points[k] is the first code point of input class k
+        self.points = None
+        # transitions[state] = {input class: next state}, accept[state] = token expression index or -1
+        self.transitions = None
+        self.accept = None
+        self.start = 0
+        cache_path = os.path.join(cache_dir, f'{self.digest()}.json') if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            self.load(cache_path)
+        else:
+            self.build()
+            if cache_path:
+                os.makedirs(cache_dir, exist_ok=True)
+                self.save(cache_path)
+        # per state cache of character -> next state (-1 for no transition), filled while scanning
+        self.rows = [{} for _ in self.accept]
+
+    def digest(self) -> str:
+        key = json.dumps([TABLE_VERSION, self.token_exprs])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+    def build(self):
+        nfas = [build_nfa(pattern) for pattern, _ in self.token_exprs]
+        points = {0, MAX_CODE_POINT}
+        for (pattern, _), nfa in zip(self.token_exprs, nfas):
+            for state in nfa.states.values():
+                for matcher, _ in state.transitions:
+                    if not isinstance(matcher, (EpsilonMatcher, CharacterMatcher, CustomMatcher)):
+                        raise ValueError(f"{pattern}: {type(matcher).__name__} is not supported by the DFA lexer")
+                    points |= boundaries(matcher)
+        self.points = sorted(p for p in points if p < MAX_CODE_POINT)
+        dfa_transitions, dfa_accept = self.subset_construction(nfas)
+        self.transitions, self.accept, self.start = self.minimize(dfa_transitions, dfa_accept)
+
+    def subset_construction(self, nfas: list[EngineNFA]) -> tuple[list[dict], list[int]]:
+        # number the NFA states of all expressions, state 0 is the new start with ε to every NFA
+        ids = {}
+        epsilon = [[]]
+        moves = [[]]
+        accept = [-1]
+        representatives = [chr(p) for p in self.points]
+        for index, nfa in enumerate(nfas):
+            for name in nfa.states:
+                ids[(index, name)] = len(epsilon)
+                epsilon.append([])
+                moves.append([])
+                accept.append(index if name == nfa.ending_states[0] else -1)
+            epsilon[0].append(ids[(index, nfa.initial_state)])
+            for name, state in nfa.states.items():
+                for matcher, to_state in state.transitions:
+                    target = ids[(index, to_state.name)]
+                    if isinstance(matcher, EpsilonMatcher):
+                        epsilon[ids[(index, name)]].append(target)
+                    else:
+                        classes = [k for k, c in enumerate(representatives) if matcher.matches(c, 0)[0]]
+                        moves[ids[(index, name)]].append((classes, target))
+
+        def closure(states) -> frozenset:
+            result = set(states)
+            work_list = list(states)
+            while work_list:
+                for t in epsilon[work_list.pop()]:
+                    if t not in result:
+                        result.add(t)
+                        work_list.append(t)
+            return frozenset(result)
+
+        start = closure([0])
+        dfa_states = {start: 0}
+        work_list = [start]
+        dfa_transitions = [{}]
+        dfa_accept = [min((accept[s] for s in start if accept[s] >= 0), default=-1)]
+        while work_list:
+            current = work_list.pop()
+            targets = {}
+            for s in current:
+                for classes, target in moves[s]:
+                    for k in classes:
+                        targets.setdefault(k, set()).add(target)
+            for k, target_states in targets.items():
+                target = closure(target_states)
+                if target not in dfa_states:
+                    dfa_states[target] = len(dfa_transitions)
+                    dfa_transitions.append({})
+                    dfa_accept.append(min((accept[s] for s in target if accept[s] >= 0), default=-1))
+                    work_list.append(target)
+                dfa_transitions[dfa_states[current]][k] = dfa_states[target]
+        return dfa_transitions, dfa_accept
+
+    def minimize(self, transitions: list[dict], accept: list[int]) -> tuple[list[dict], list[int], int]:
+        """
+        Hopcroft's algorithm. A dead state makes the DFA total, it is dropped again from the result.
+        """
+        dead = len(transitions)
+        n = dead + 1
+        classes = len(self.points)
+        inverse = [[[] for _ in range(n)] for _ in range(classes)]
+        for s in range(n):
+            row = transitions[s] if s < dead else {}
+            for k in range(classes):
+                inverse[k][row.get(k, dead)].append(s)
+
+        groups = {}
+        for s in range(n):
+            groups.setdefault(accept[s] if s < dead else -1, set()).add(s)
+        partition = [g for g in groups.values()]
+        block = [0] * n
+        for i, g in enumerate(partition):
+            for s in g:
+                block[s] = i
+        work_list = set(range(len(partition)))
+        while work_list:
+            splitter = partition[work_list.pop()]
+            for k in range(classes):
+                predecessors = {p for s in splitter for p in inverse[k][s]}
+                if not predecessors:
+                    continue
+                touched = {}
+                for p in predecessors:
+                    touched.setdefault(block[p], set()).add(p)
+                for b, inside in touched.items():
+                    if len(inside) == len(partition[b]):
+                        continue
+                    outside = partition[b] - inside
+                    partition[b] = inside
+                    partition.append(outside)
+                    new = len(partition) - 1
+                    for s in outside:
+                        block[s] = new
+                    if b in work_list:
+                        work_list.add(new)
+                    else:
+                        work_list.add(b if len(inside) <= len(outside) else new)
+
+        # renumber blocks, the start state first and without the dead block
+        dead_block = block[dead]
+        order = {block[0]: 0}
+        for s in range(dead):
+            if block[s] != dead_block and block[s] not in order:
+                order[block[s]] = len(order)
+        min_transitions = [{} for _ in order]
+        min_accept = [-1] * len(order)
+        for s in range(dead):
+            if block[s] == dead_block:
+                continue
+            b = order[block[s]]
+            min_accept[b] = accept[s]
+            for k, t in transitions[s].items():
+                if block[t] != dead_block:
+                    min_transitions[b][k] = order[block[t]]
+        return min_transitions, min_accept, 0
+
+    def save(self, path: str):
+        tables = {
+            'version': TABLE_VERSION,
+            'points': self.points,
+            'transitions': [list(row.items()) for row in self.transitions],
+            'accept': self.accept,
+            'start': self.start,
+        }
+        with open(path, 'w') as f:
+            json.dump(tables, f)
+
+    def load(self, path: str):
+        with open(path) as f:
+            tables = json.load(f)
+        if tables['version'] != TABLE_VERSION:
+            raise ValueError(f"{path}: table version {tables['version']}, expect {TABLE_VERSION}")
+        self.points = tables['points']
+        self.transitions = [dict((k, t) for k, t in row) for row in tables['transitions']]
+        self.accept = tables['accept']
+        self.start = tables['start']
+
+    def step(self, state: int, char: str) -> int:
+        """
+        transition on a character not in the row cache yet
+        """
+        k = bisect.bisect_right(self.points, ord(char)) - 1
+        target = self.transitions[state].get(k, -1)
+        self.rows[state][char] = target
+        return target
+
+    def scan(self, text: str):
+        """
+        generate the tokens of text
+        """
+        rows, accept, tags, step = self.rows, self.accept, self.tags, self.step
+        source = Source(text)
+        pos, n = 0, len(text)
+        while pos < n:
+            state, i = self.start, pos
+            last, end = -1, pos
+            while i < n:
+                char = text[i]
+                target = rows[state].get(char)
+                if target is None:
+                    target = step(state, char)
+                if target < 0:
+                    break
+                state = target
+                i += 1
+                if accept[state] >= 0:
+                    last, end = accept[state], i
+            if last < 0:
+                raise ValueError('Illegal character: %s at line %d column %d' % (text[pos], *source.line_column(pos)))
+            if tags[last]:
+                yield Token(tags[last], source=source, start=pos, end=end)
+            pos = end
+
+    def tokenize(self, text: str) -> list[Token]:
+        return list(self.scan(text))
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-from graphviz import Digraph
-
 from regex.NFAMatcher import Matcher
 
 
@@ -53,6 +51,8 @@ class EngineNFA:
         self.counters = []
 
     def draw_nfa(self, path: str, label: str = None):
+        from graphviz import Digraph
+
         dot = Digraph(comment='NFA')
         dot.graph_attr['rankdir'] = 'LR'
         dot.attr(label=label)
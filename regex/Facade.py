@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from enum import Enum, auto
 
+from util.Lexer import Source, Token as SourceToken
+
 
 class TokenType(Enum):
     # single token
@@ -47,10 +49,15 @@ class TokenType(Enum):
     EOF = auto()  # EOF
 
 
-class Token:
-    def __init__(self, type_: TokenType, value: str = None):
-        self.type = type_
-        self.value = value
+class Token(SourceToken):
+    """
+    A token of a regex, its value is sliced from the regex when it is read unless it was given (an escaped character),
+    see util.Lexer.Token
+    """
+    __slots__ = ()
+
+    def __init__(self, type_: TokenType, value: str = None, source: Source = None, start: int = -1, end: int = -1):
+        super().__init__(type_, value, source, start, end)
 
     def __repr__(self):
         return f"Token({self.type}, {repr(self.value)})"
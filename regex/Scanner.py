@@ -1,11 +1,13 @@
 from typing import List
 
 from regex.Facade import TokenType, Token
+from util.Lexer import Source
 
 
 class Scanner:
     def __init__(self, input_):
         self.input = input_
+        self.source = Source(input_)
         self.tokens = []
         self.start = 0
         self.current = 0
@@ -45,6 +47,13 @@ class Scanner:
             'Z': TokenType.END_OFF_STRING_ONLY,
             # 'G': TokenType.PRE_MATCH_END
         }
+        self.control_map = {
+            'n': '\n',
+            't': '\t',
+            'r': '\r',
+            'f': '\f',
+            'v': '\v',
+        }
 
     def scan_tokens(self) -> List[Token]:
         while not self.is_end():
@@ -63,13 +72,13 @@ class Scanner:
         if not token_type:
             if self.is_valid_char(char):
                 if char.isdigit():
-                    self.add_token(TokenType.INT, char)
+                    self.add_token(TokenType.INT)
                 elif (65 <= ord(char) <= 90) or (97 <= ord(char) <= 122):
-                    self.add_token(TokenType.LETTER, char)
+                    self.add_token(TokenType.LETTER)
                 elif char.isascii():
-                    self.add_token(TokenType.ASCII, char)
+                    self.add_token(TokenType.ASCII)
                 else:
-                    self.add_token(TokenType.CHAR, char)
+                    self.add_token(TokenType.CHAR)
             else:
                 raise ValueError(f"character {char} at {self.current} not supported")
         else:
@@ -77,7 +86,7 @@ class Scanner:
                 # escapes
                 next_char = self.peek()
                 if next_char == '\0':
-                    self.add_token(TokenType.ASCII, char)
+                    self.add_token(TokenType.ASCII)
                 else:
 
                     if next_char in self.token_map:
@@ -86,18 +95,28 @@ class Scanner:
                     elif next_char in self.escape_map:
                         self.advance()
                         self.add_token(self.escape_map[next_char], next_char)
+                    elif next_char in self.control_map:
+                        self.advance()
+                        self.add_token(TokenType.ASCII, self.control_map[next_char])
+                    elif next_char.isascii() and not next_char.isalnum() and not next_char.isspace():
+                        # escaped punctuation is the literal character, like \/ or \#
+                        self.advance()
+                        self.add_token(TokenType.ASCII, next_char)
                     else:
-                        self.add_token(TokenType.ESCAPE, char)
+                        self.add_token(TokenType.ESCAPE)
                         #  raise ValueError(f"character {char} at {self.current} can't be escaped")
             else:
-                self.add_token(token_type, char)
+                self.add_token(token_type)
 
     def advance(self) -> str:
         self.current += 1
         return self.input[self.current - 1]
 
     def add_token(self, token_type: TokenType, value: str = None):
-        self.tokens.append(Token(token_type, value))
+        """
+        a token of the characters from start to current, value only when it isn't their text (an escape)
+        """
+        self.tokens.append(Token(token_type, value, self.source, self.start, self.current))
 
     def match(self, expected: str) -> bool:
         if self.is_end():
@@ -0,0 +1,29 @@
+import random
+import unittest
+
+from LR.BatchRecognizer import BatchRecognizer
+from LR.LALR1Parser import LALR1Parser
+from util.Lexer import Token
+
+
+class BatchRecognizerTest(unittest.TestCase):
+    def test1(self):
+        parser = LALR1Parser('g5.bnf', show_graph_state=False, show_parsing_table=False, print_first_follow=False)
+        parser.canonical_collection()
+        parser.build_parse_table()
+        recognizer = BatchRecognizer(parser)
+
+        rnd = random.Random(7)
+        symbols = ['NUMBER', 'NUMBER', 'NUMBER', '+', '-', '*', '/', '(', ')', 'IDENTIFIER']
+        batch = [[Token('NUMBER', '1'), Token('+', '+'), Token('NUMBER', '2')], [], [Token('(', '(')]]
+        for _ in range(300):
+            batch.append([Token(s, s) for s in rnd.choices(symbols, k=rnd.randint(1, 12))])
+        batch = [tokens + [Token('$', '$')] for tokens in batch]
+
+        accepted, error_pos = recognizer.recognize(batch)
+        for tokens, ok, pos in zip(batch, accepted, error_pos):
+            expected = parser.recognize(tokens)
+            self.assertEqual(expected == -1, bool(ok))
+            self.assertEqual(expected, int(pos))
+        self.assertTrue(accepted[0])
+        self.assertEqual([0, 1], list(error_pos[1:3]))
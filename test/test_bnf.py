@@ -1,6 +1,11 @@
+import os
+import random
+import shlex
+import tempfile
 import unittest
 
-from util.BnfBuilder import BnfBuilder
+from util.BnfBuilder import BnfBuilder, digraph
+from util.BnfLexer import BnfLexer
 
 
 class LL1Test(unittest.TestCase):
@@ -22,3 +27,134 @@ class LL1Test(unittest.TestCase):
         v = {"p1": 2, "p2": "+", "p3": 5, "result": None}
         exec(semantic_action, v)
         print(v.get('result'))
+
+    def test3(self):
+        # BnfLexer splits the declaration lines like shlex
+        rng = random.Random(3)
+        alphabet = ['a', 'b', ' ', '\t', '"', "'", '\\', '->', '|', '\n']
+        for _ in range(5000):
+            line = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+            try:
+                expected = shlex.split(line)
+            except ValueError:
+                with self.assertRaises(AssertionError):
+                    BnfLexer.split(line)
+                continue
+            self.assertEqual(expected, BnfLexer.split(line), repr(line))
+
+        text = ('%left + -\n'
+                'E -> "a b" \'|\'\n'
+                '{\n'
+                '  s = "it\'s"\n'
+                '\n'
+                '// skipped\n'
+                '  result = s}\n'
+                '  |\n'
+                '%sync ;\n')
+        self.assertEqual([('precedence', '%left + -\n', 'left', ['+', '-']),
+                          ('production', 'E -> "a b" \'|\'\n', 'E', ['a b', '|']),
+                          ('action', '{\n', '{\n  s = "it\'s"\n  result = s}\n'),
+                          ('alternative', '  |\n', []),
+                          ('sync', '%sync ;\n', [';'])], list(BnfLexer(text).items()))
+        with self.assertRaises(AssertionError):
+            list(BnfLexer('E -> "a\n').items())
+        with self.assertRaises(AssertionError):
+            list(BnfLexer('E F -> a\n').items())
+
+    def test4(self):
+        # the fixpoint FIRST/FOLLOW the digraph solver replaced
+        def first(grammar, epsilon='ε'):
+            result = {g: set() for g in grammar}
+            is_change = True
+            while is_change:
+                count = sum(len(v) for v in result.values())
+                for g in grammar:
+                    for rules in grammar[g]:
+                        for r in rules:
+                            f = set(result.get(r, {r}))
+                            result[g] |= f
+                            if epsilon not in f:
+                                break
+                is_change = count != sum(len(v) for v in result.values())
+            return result
+
+        def follow(grammar, first_set, start_symbol, epsilon='ε', eof='$'):
+            result = {g: set() for g in grammar}
+            result[start_symbol].add(eof)
+            is_change = True
+            while is_change:
+                count = sum(len(v) for v in result.values())
+                for g in grammar:
+                    for rule in grammar[g]:
+                        for i, s in enumerate(rule):
+                            if s not in grammar:
+                                continue
+                            if i == len(rule) - 1:
+                                result[s] |= result[g]
+                            else:
+                                result[s] |= first_set.get(rule[i + 1], {rule[i + 1]}) - {epsilon}
+                is_change = count != sum(len(v) for v in result.values())
+            return result
+
+        for bnf in ('g5.bnf', 'g7.bnf', 'g8.bnf', 'g9.bnf', 'g12.bnf', 'g14.bnf', 'g15.bnf'):
+            builder = BnfBuilder(bnf)
+            builder.build()
+            builder.build_first_set()
+            builder.build_follow_set()
+            self.assertEqual(first(builder.production_map), builder.first_set, bnf)
+            self.assertEqual(follow(builder.production_map, builder.first_set, builder.start_symbol),
+                             builder.follow_set, bnf)
+        rng = random.Random(7)
+        non_terminals = ['S', 'A', 'B', 'C', 'D', 'E']
+        for _ in range(200):
+            grammar = {nt: [[rng.choice(non_terminals + ['a', 'b', 'c', 'ε']) for _ in range(rng.randint(1, 4))]
+                            for _ in range(rng.randint(1, 3))] for nt in non_terminals}
+            first_set = BnfBuilder.first(grammar)
+            self.assertEqual(first(grammar), first_set, grammar)
+            self.assertEqual(follow(grammar, first_set, 'S'),
+                             BnfBuilder.follow(grammar, first_set, set(grammar), 'S'), grammar)
+
+    def test5(self):
+        # a -> b -> c -> a is one component, d only reaches it
+        edges = {'a': ['b'], 'b': ['c'], 'c': ['a'], 'd': ['a']}
+        init = {'a': {1}, 'b': {2}, 'c': {3}, 'd': {4}}
+        result = digraph(edges, edges, init)
+        self.assertEqual({1, 2, 3}, result['a'])
+        self.assertEqual({1, 2, 3}, result['c'])
+        self.assertEqual({1, 2, 3, 4}, result['d'])
+        self.assertIsNot(result['a'], result['b'])
+        # deep chains don't recurse
+        n = 5000
+        edges = {i: [i + 1] if i + 1 < n else [] for i in range(n)}
+        result = digraph(edges, edges, {i: {i} for i in range(n)})
+        self.assertEqual(set(range(n)), result[0])
+
+    def test6(self):
+        builder = BnfBuilder('g17.bnf')
+        builder.build()
+        # lists are left recursive helpers, * and ? split the production
+        self.assertEqual([['S'], ['S+', 'S']], builder.production_map['S+'])
+        self.assertEqual([[',', 'E']], builder.production_map['(, E)'])
+        self.assertIn(['print', 'E', ';'], builder.production_map['S'])
+        self.assertIn(['return', ';'], builder.production_map['S'])
+        self.assertIn(['ID', '(', ')'], builder.production_map['E'])
+        self.assertNotIn('S+', builder.terminals)
+        self.assertEqual({'(', ')', ',', ';', '=', 'ID', 'NUMBER', 'print', 'return'}, builder.terminals)
+        self.assertEqual(builder.grammar_list, [(lhs, tuple(rhs)) for lhs in builder.production_map
+                                                for rhs in builder.production_map[lhs]])
+        self.assertFalse(BnfBuilder.is_ebnf('**'))
+        self.assertFalse(BnfBuilder.is_ebnf('+='))
+
+    def test7(self):
+        # * and ? don't make ε alternatives, a written out ε alternative is kept
+        path = os.path.join(tempfile.mkdtemp(), 'g.bnf')
+        for text in ('S -> x A\nA -> y*\n', 'S -> x A\nA -> y? z*\n', 'S -> x A\nA -> y\n  | ( z? )+ w\n'):
+            with open(path, 'w') as f:
+                f.write(text)
+            with self.assertRaises(AssertionError):
+                BnfBuilder(path).build()
+        with open(path, 'w') as f:
+            f.write('S -> x A\nA -> y+\n  |\n')
+        builder = BnfBuilder(path)
+        builder.build()
+        self.assertEqual([['y+'], ['ε']], builder.production_map['A'])
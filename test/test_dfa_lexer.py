@@ -0,0 +1,88 @@
+import random
+import re
+import tempfile
+import unittest
+
+from regex.DFALexer import DFALexer
+
+token_exprs = [
+    (r'[ \n\t]+', None),
+    (r'#[^\n]*', None),
+    (r'[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?', 'NUMBER'),
+    (r'"([^"\\]|\\.)*"', 'STRING'),
+    (r'\(', '('),
+    (r'\)', ')'),
+    (r'\+', '+'),
+    (r'\-', '-'),
+    (r'\*\*', 'POW'),
+    (r'\*', '*'),
+    (r'\/', '/'),
+    (r'if', 'IF'),
+    (r'\w+', 'IDENTIFIER'),
+]
+
+
+def longest_match(text: str) -> list[tuple]:
+    """
+    reference scanner on python re: longest match, the earlier expression on ties
+    """
+    regexes = [(re.compile(p), tag) for p, tag in token_exprs]
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        best, best_tag = pos, None
+        for regex, tag in regexes:
+            m = regex.match(text, pos)
+            if m and m.end() > best:
+                best, best_tag = m.end(), tag
+        if best == pos:
+            raise ValueError(text[pos])
+        if best_tag:
+            tokens.append((best_tag, text[pos:best]))
+        pos = best
+    return tokens
+
+
+class DFALexerTest(unittest.TestCase):
+    def test1(self):
+        lexer = DFALexer(token_exprs)
+        tokens = lexer.tokenize('x1 ** 2.5e-3*(iffy - if) # comment\n"a \\" b" + .5')
+        self.assertEqual([('IDENTIFIER', 'x1'), ('POW', '**'), ('NUMBER', '2.5e-3'), ('*', '*'), ('(', '('),
+                          ('IDENTIFIER', 'iffy'), ('-', '-'), ('IF', 'if'), (')', ')'), ('STRING', '"a \\" b"'),
+                          ('+', '+'), ('NUMBER', '.5')], [(t.type, t.value) for t in tokens])
+        with self.assertRaises(ValueError):
+            lexer.tokenize('1 + $')
+
+    def test2(self):
+        lexer = DFALexer(token_exprs)
+        rng = random.Random(3)
+        pieces = ['x', 'if', 'i', '1', '.', '5', 'e', '-', '+', '*', '**', ' ', '\n', '#c\n', '"s"', '"\\""', '(', ')']
+        for _ in range(300):
+            text = ''.join(rng.choice(pieces) for _ in range(rng.randint(1, 30)))
+            try:
+                expected = longest_match(text)
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    lexer.tokenize(text)
+                continue
+            self.assertEqual(expected, [(t.type, t.value) for t in lexer.tokenize(text)], text)
+
+    def test3(self):
+        # minimization merges the equivalent states of a|b and [ab]
+        self.assertEqual(2, len(DFALexer([(r'(a|b)(a|b)*', 'AB')]).accept))
+        self.assertEqual(2, len(DFALexer([(r'[ab]+', 'AB')]).accept))
+        with self.assertRaises(ValueError):
+            DFALexer([(r'a{2}', 'A')])
+        with self.assertRaises(ValueError):
+            DFALexer([(r'^a', 'A')])
+
+    def test4(self):
+        cache_dir = tempfile.mkdtemp()
+        built = DFALexer(token_exprs, cache_dir=cache_dir)
+        loaded = DFALexer(token_exprs, cache_dir=cache_dir)
+        self.assertEqual(built.transitions, loaded.transitions)
+        self.assertEqual(built.accept, loaded.accept)
+        self.assertEqual(built.points, loaded.points)
+        text = 'a - 1 + b ** 2 # c\n'
+        self.assertEqual([(t.type, t.value) for t in built.tokenize(text)],
+                         [(t.type, t.value) for t in loaded.tokenize(text)])
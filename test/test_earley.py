@@ -0,0 +1,77 @@
+import unittest
+
+from Earley.EarleyParser import EarleyParser
+from util.Lexer import Lexer, Token
+
+
+def tokenize(text, token_exprs):
+    return Lexer(text, token_exprs).tokenize_all() + [Token('$', '$')]
+
+
+class EarleyTest(unittest.TestCase):
+    token_exprs = [
+        (r'[ \n\t]+', None),
+        (r'[0-9]+', 'NUMBER'),
+        (r'\(', '('),
+        (r'\)', ')'),
+        (r'\+', '+'),
+        (r'\-', '-'),
+        (r'\*', '*'),
+        (r'\/', '/'),
+        (r',', ','),
+        (r'[a-z]+', 'ID'),
+    ]
+
+    def test1(self):
+        parser = EarleyParser('g5.bnf')
+        parser.parse(tokenize("1+2*(3 - 4)", self.token_exprs))
+        self.assertEqual('+', parser.ast['op'])
+        self.assertEqual('-', parser.ast['right']['right']['op'])
+        self.assertEqual(-1, parser.recognize(tokenize("(1)", self.token_exprs)))
+        self.assertEqual(3, parser.recognize(tokenize("1+(*2)", self.token_exprs)))
+        self.assertEqual(3, parser.recognize(tokenize("1+(", self.token_exprs)))
+        with self.assertRaises(AssertionError):
+            parser.parse(tokenize("1+", self.token_exprs))
+
+    def test2(self):
+        # ambiguous grammar
+        parser = EarleyParser('g13.bnf')
+        parser.parse(tokenize("2*3+4", self.token_exprs))
+        self.assertIn(parser.ast, (10, 14))
+
+    def test3(self):
+        # right recursion stays linear with Leo items
+        parser = EarleyParser('g14.bnf')
+        text = ','.join(['a'] * 3000)
+        self.assertEqual(-1, parser.recognize(tokenize(text, self.token_exprs)))
+        self.assertLess(max(len(s) for s in parser.chart[0]), 10)
+        parser.parse(tokenize(','.join(['a', 'b', 'c']), self.token_exprs))
+        self.assertEqual(['a', 'b', 'c'], parser.ast)
+
+    def test4(self):
+        # nullable symbols
+        token_exprs = [(r'a', 'a'), (r'x', 'x')]
+        parser = EarleyParser('g15.bnf')
+        parser.parse(tokenize("x", token_exprs))
+        self.assertEqual([None, [None, None], 'x'], parser.ast)
+        parser.parse(tokenize("aax", token_exprs))
+        self.assertEqual(['a', 'a'], [v for v in [parser.ast[0]] + parser.ast[1] if v])
+        self.assertNotEqual(-1, parser.recognize(tokenize("aaaax", token_exprs)))
+        # a nullable symbol used twice in one rhs gets its tree both times
+        parser = EarleyParser('g18.bnf')
+        parser.parse(tokenize("x", token_exprs))
+        self.assertEqual([[('A', 'B'), ('A', 'B')], 'x'], parser.ast)
+
+    def test5(self):
+        # the tree and the semantic actions are built without recursion
+        parser = EarleyParser('g5.bnf')
+        parser.parse(tokenize('-'.join(['1'] * 2000) + '*2', self.token_exprs))
+        node, depth = parser.ast, 0
+        while node['type'] == 'BinaryExpression' and node['op'] == '-':
+            node, depth = node['left'], depth + 1
+        self.assertEqual(1999, depth)
+        # actions get the same namespace as in the LR parsers, node is the AST node factory
+        parser = EarleyParser('g11.bnf')
+        parser.parse(tokenize("1+2*(3 - 4)", self.token_exprs))
+        self.assertEqual('BinaryExpression', parser.ast.node_type)
+        self.assertEqual('-', parser.ast.right.right.op)
@@ -0,0 +1,77 @@
+import math
+import unittest
+
+from LR.GLRParser import GLRParser
+from util.Lexer import Lexer, Token
+
+
+class GLRTest(unittest.TestCase):
+    token_exprs = [
+        (r'[ \n\t]+', None),
+        (r'[0-9]+', 'NUMBER'),
+        (r'\(', '('),
+        (r'\)', ')'),
+        (r'\+', '+'),
+        (r'\-', '-'),
+        (r'\*', '*'),
+        (r'\/', '/'),
+    ]
+
+    def tokens(self, text):
+        return Lexer(text, self.token_exprs).tokenize_all() + [Token('$', '$')]
+
+    def parser(self, bnf):
+        parser = GLRParser(bnf, show_graph_state=False, show_parsing_table=False, print_first_follow=False)
+        parser.canonical_collection()
+        parser.build_parse_table()
+        return parser
+
+    def test1(self):
+        parser = self.parser('g13.bnf')
+        self.assertEqual(1, parser.parse(self.tokens("1")).count_trees())
+        self.assertEqual(2, parser.parse(self.tokens("1+2*3")).count_trees())
+        # catalan numbers
+        forest = parser.parse(self.tokens("1+2+3+4+5"))
+        self.assertTrue(forest.is_ambiguous())
+        self.assertEqual(14, forest.count_trees())
+        self.assertEqual(14, len(list(forest.trees())))
+        self.assertEqual((0, 9), (forest.start, forest.end))
+
+    def test2(self):
+        parser = self.parser('g13.bnf')
+        parser.parse(self.tokens("2*3+4"))
+        values = set()
+        for production, children in parser.forest.derivations():
+            values.add(parser.run_semantic_action(production, [parser.evaluate(c) if hasattr(c, 'families') else c
+                                                               for c in children]))
+        self.assertEqual({10, 14}, values)
+        with self.assertRaises(AssertionError):
+            parser.parse(self.tokens("1+*2"))
+        with self.assertRaises(AssertionError):
+            parser.parse(self.tokens("1+"))
+
+    def test3(self):
+        # precedence declarations still filter the conflicts
+        parser = self.parser('g7.bnf')
+        forest = parser.parse(self.tokens("1+2*3-4/(5 - 6)"))
+        self.assertEqual(1, forest.count_trees())
+        self.assertEqual('+', parser.evaluate()['left']['op'])
+
+    def test4(self):
+        # the forest walks are iterative, a long left recursive chain is deeper than the recursion limit
+        parser = self.parser('g5.bnf')
+        forest = parser.parse(self.tokens('-'.join(['1'] * 2000) + '*2'))
+        self.assertEqual(1, forest.count_trees())
+        self.assertFalse(forest.is_ambiguous())
+        self.assertEqual(1, len(list(forest.trees())))
+        ast = parser.evaluate()
+        depth = 0
+        while ast['type'] == 'BinaryExpression':
+            ast = ast['left']
+            depth += 1
+        self.assertEqual(1999, depth)
+        # binarised reductions share the splits of E + E, the forest of 60 operands has catalan(59) trees
+        parser = self.parser('g13.bnf')
+        forest = parser.parse(self.tokens('+'.join(['1'] * 60)))
+        self.assertEqual(math.comb(118, 59) // 60, forest.count_trees())
+        self.assertEqual(60, parser.evaluate())
@@ -0,0 +1,41 @@
+import unittest
+
+from util.BnfBuilder import BnfBuilder
+from util.GrammarIR import GrammarIR
+
+
+class GrammarIRTest(unittest.TestCase):
+    def test1(self):
+        # without ε productions the IR gives the same FIRST and FOLLOW sets as BnfBuilder
+        for bnf in ('g5.bnf', 'g7.bnf', 'g8.bnf', 'g9.bnf', 'g12.bnf', 'g14.bnf'):
+            builder = BnfBuilder(bnf)
+            builder.build()
+            builder.build_first_set()
+            builder.build_follow_set()
+            ir = GrammarIR(builder)
+            self.assertEqual(builder.first_set, ir.first_set(), bnf)
+            self.assertEqual(builder.follow_set, ir.follow_set(), bnf)
+
+    def test2(self):
+        builder = BnfBuilder('g15.bnf')
+        builder.build()
+        ir = GrammarIR(builder, augment=True)
+        self.assertEqual(('a', 'x', '$', 'A', 'B', 'S', "S'"), ir.symbols)
+        self.assertEqual(3, ir.terminal_count)
+        # S' -> S, S -> A B x, A -> a, A -> ε, B -> A A
+        a, x, A, B, S = (ir.symbol_id[s] for s in ('a', 'x', 'A', 'B', 'S'))
+        self.assertEqual((0, 1, 4, 5, 5, 7), ir.rhs_offset)
+        self.assertEqual((A, B, x), ir.production_rhs(1))
+        self.assertEqual((S,), ir.production_rhs(0))
+        self.assertEqual((), ir.production_rhs(3))
+        self.assertEqual((2, 3), ir.productions_of[A])
+        self.assertEqual((1, 4), ir.uses[A])
+        self.assertEqual({'A', 'B'}, ir.names(ir.nullable))
+        self.assertEqual({'a', 'x'}, ir.names(ir.first[S]))
+        self.assertEqual({'a', 'x'}, ir.names(ir.follow[A]))
+        self.assertEqual({'x'}, ir.names(ir.follow[B]))
+        self.assertEqual({'$'}, ir.names(ir.follow[S]))
+        self.assertEqual((1 << a, True), ir.sequence_first((A, B)))
+        self.assertEqual({'a', 'ε'}, ir.first_set()['B'])
+        with self.assertRaises(AttributeError):
+            ir.nullable = 0
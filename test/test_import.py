@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPTIONAL_MODULES = ('graphviz', 'prettytable', 'jsbeautifier')
+
+
+def import_time(module: str) -> dict[str, int]:
+    """
+    import a module in a fresh interpreter with -X importtime, return {module: cumulative microseconds}
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class ImportTest(unittest.TestCase):
+    def test_headless(self):
+        for module in ('LR.LALR1Parser', 'LR.LR1Parser', 'LR.SLR1Parser', 'regex.NFARegex'):
+            times = import_time(module)
+            print(f'{module}: {times[module]} us')
+            loaded = [m for m in times if m.split('.')[0] in OPTIONAL_MODULES]
+            self.assertEqual([], loaded, f'{module} imports {loaded}')
@@ -64,4 +64,220 @@ class LALR1Test(unittest.TestCase):
             inputs.append(lexer.next())
         inputs.append(Token('$', '$'))
 
-        parser.parse(inputs)
\ No newline at end of file
+        parser.parse(inputs)
+
+    def test4(self):
+        token_exprs = [
+            (r'[ \n\t]+', None),
+            (r'[-]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?', 'NUMBER'),
+            (r'\(', '('),
+            (r'\)', ')'),
+            (r'\+', '+'),
+            (r'\-', '-'),
+            (r'\*', '*'),
+            (r'\/', '/'),
+        ]
+        text = "1+2*3+( 1 - 2)/3 - 5+6*4/7"
+        asts = []
+        for eliminate in (False, True):
+            parser = LALR1Parser('g5.bnf', show_graph_state=False, show_parsing_table=False, print_ast=False)
+            parser.canonical_collection()
+            parser.build_parse_table()
+            if eliminate:
+                self.assertGreater(parser.eliminate_unit_productions(), 0)
+            inputs = Lexer(text, token_exprs).tokenize_all() + [Token('$', '$')]
+            parser.parse(inputs)
+            asts.append(parser.ast)
+        self.assertEqual(asts[0], asts[1])
+        self.assertGreater(parser.unit_reductions_skipped, 0)
+
+    def test5(self):
+        token_exprs = [
+            (r'[ \n\t]+', None),
+            (r'[-]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?', 'NUMBER'),
+            (r'\(', '('),
+            (r'\)', ')'),
+            (r'\+', '+'),
+            (r'\-', '-'),
+            (r'\*', '*'),
+            (r'\/', '/'),
+        ]
+        text = "1+2*(3 - 4)"
+        asts = []
+        for bnf in ('g5.bnf', 'g11.bnf'):
+            parser = LALR1Parser(bnf, show_graph_state=False, show_parsing_table=False, show_parsing_steps=False)
+            parser.canonical_collection()
+            parser.build_parse_table()
+            inputs = Lexer(text, token_exprs).tokenize_all() + [Token('$', '$')]
+            parser.parse(inputs)
+            asts.append(parser.ast)
+        self.assertFalse(hasattr(asts[1], '__dict__'))
+        self.assertEqual(asts[1].left.value, '1')
+        self.assertEqual(asts[0], asts[1].to_dict())
+        with self.assertRaises(TypeError):
+            hash(asts[1])
+        with self.assertRaises(AssertionError):
+            parser.node_factory("Literal", node_type='x')
+
+    def test6(self):
+        token_exprs = [
+            (r'[ \n\t]+', None),
+            (r'[0-9]+', 'NUMBER'),
+            (r'\(', '('),
+            (r'\)', ')'),
+            (r'\+', '+'),
+            (r'\-', '-'),
+            (r';', ';'),
+        ]
+        text = "1+2; 3+; 4 5; (6; 7-1;"
+        parser = LALR1Parser('g12.bnf', show_graph_state=False, show_parsing_table=False, print_ast=False)
+        parser.canonical_collection()
+        parser.build_parse_table()
+        inputs = Lexer(text, token_exprs).tokenize_all() + [Token('$', '$')]
+        parser.parse(inputs, recover=True)
+        self.assertEqual([e.pos for e in parser.errors], [6, 8, 12])
+        self.assertEqual(len(parser.ast), 5)
+        self.assertEqual(parser.ast[1:4], [None, None, None])
+        self.assertEqual(parser.ast[4]['op'], '-')
+
+        with self.assertRaises(AssertionError):
+            parser.parse(inputs)
+
+    def test7(self):
+        token_exprs = [
+            (r'[ \n\t]+', None),
+            (r'[0-9]+', 'NUMBER'),
+            (r'\+', '+'),
+            (r'\*', '*'),
+        ]
+        parser = LALR1Parser('g7.bnf', show_graph_state=False, show_parsing_table=False, print_ast=False,
+                             sync_tokens=['+'])
+        parser.canonical_collection()
+        parser.build_parse_table()
+        inputs = Lexer("1 + * 2 + 3", token_exprs).tokenize_all() + [Token('$', '$')]
+        parser.parse(inputs, recover=True)
+        self.assertEqual(len(parser.errors), 1)
+        self.assertEqual(parser.errors[0].pos, 2)
+        self.assertEqual(parser.ast, {"type": "BinaryExpression", "op": "+", "left": "1", "right": "3"})
+
+    def test8(self):
+        token_exprs = [
+            (r'[ \n\t]+', None),
+            (r'[0-9]+', 'NUMBER'),
+            (r'\(', '('),
+            (r'\)', ')'),
+            (r'\+', '+'),
+            (r'\-', '-'),
+            (r'\*', '*'),
+            (r'\/', '/'),
+        ]
+        parser = LALR1Parser('g5.bnf', show_graph_state=False, show_parsing_table=False, print_ast=False)
+        parser.canonical_collection()
+        parser.build_parse_table()
+        for text, expected in (("1+2*(3 - 4)/5", -1), ("1+2*(3 - 4))", 9), ("1+*2", 2), ("(1", 2)):
+            inputs = Lexer(text, token_exprs).tokenize_all() + [Token('$', '$')]
+            self.assertEqual(expected, parser.recognize(inputs), text)
+        self.assertIsNone(parser.ast)
+
+    def test9(self):
+        token_exprs = [
+            (r'[ \n\t]+', None),
+            (r'[0-9]+', 'NUMBER'),
+            (r'\(', '('),
+            (r'\)', ')'),
+            (r'\+', '+'),
+            (r'\-', '-'),
+            (r'\*', '*'),
+            (r'\/', '/'),
+        ]
+        parser = LALR1Parser('g5.bnf', show_graph_state=False, show_parsing_table=False, print_ast=False)
+        parser.canonical_collection()
+        parser.build_parse_table()
+        inputs = Lexer("1+2*(3 - 4)/5", token_exprs).tokenize_all() + [Token('$', '$')]
+
+        number = parser.lookup_grammar('F', ('NUMBER',))
+        binary = 0
+        for production_id, span, children in parser.reduction_events(inputs):
+            if len(children) == 3 and children[1] is not None:
+                binary += 1
+            if production_id == number:
+                self.assertEqual('NUMBER', children[0].type)
+                self.assertEqual(span[0] + 1, span[1])
+        self.assertEqual(4, binary)
+
+        def evaluate(production_id, span, children):
+            if len(children) == 1:
+                return int(children[0].value) if children[0] and hasattr(children[0], 'type') else children[0]
+            if children[0] and hasattr(children[0], 'type'):
+                return children[1]
+            left, op, right = children[0], children[1].value, children[2]
+            return {'+': left + right, '-': left - right, '*': left * right, '/': left / right}[op]
+
+        self.assertEqual(1 + 2 * (3 - 4) / 5, parser.parse_events(inputs, evaluate))
+
+    def test10(self):
+        token_exprs = [
+            (r'[ \n\t]+', None),
+            (r'[0-9]+', 'NUMBER'),
+            (r'[a-z]+', 'ID'),
+            (r'\(', '('),
+            (r'\)', ')'),
+            (r'=', '='),
+            (r';', ';'),
+        ]
+        inputs = Lexer("a = 1; b = ((2))", token_exprs).tokenize_all() + [Token('$', '$')]
+
+        states = []
+        for reduce_grammar, inline_identity in ((False, False), (True, False), (True, True)):
+            parser = LALR1Parser('g16.bnf', show_graph_state=False, show_parsing_table=False, print_ast=False,
+                                 print_first_follow=False, show_parsing_steps=False, reduce_grammar=reduce_grammar,
+                                 inline_identity=inline_identity)
+            parser.canonical_collection()
+            parser.build_parse_table()
+            parser.parse(inputs)
+            self.assertEqual([('a', 1), ('b', 2)], parser.ast)
+            states.append(len(parser.lr0_states))
+        # U, X and W are useless (A -> ID : X goes too), the second A -> ID = V is a duplicate, V -> T is inlined
+        self.assertEqual({'non_terminals': 7, 'terminals': 7, 'productions': 11, 'symbols': 23},
+                         parser.reduction_report['before'])
+        self.assertEqual({'non_terminals': 3, 'terminals': 6, 'productions': 5, 'symbols': 11},
+                         parser.reduction_report['after'])
+        self.assertEqual({'S', 'A', 'T', "S'"}, parser.non_terminals)
+        self.assertGreater(states[0], states[1])
+        self.assertGreater(states[1], states[2])
+
+    def test11(self):
+        token_exprs = [
+            (r'[ \n\t]+', None),
+            (r'[0-9]+', 'NUMBER'),
+            (r'print\b', 'print'),
+            (r'return\b', 'return'),
+            (r'[a-z]+', 'ID'),
+            (r'\(', '('),
+            (r'\)', ')'),
+            (r'=', '='),
+            (r',', ','),
+            (r';', ';'),
+        ]
+        parser = LALR1Parser('g17.bnf', show_graph_state=False, show_parsing_table=False, print_ast=False,
+                             print_first_follow=False, show_parsing_steps=False)
+        parser.canonical_collection()
+        parser.build_parse_table()
+
+        def tokenize(text):
+            return Lexer(text, token_exprs).tokenize_all() + [Token('$', '$')]
+
+        parser.parse(tokenize("a = 1; print a, 2, 3; b = f(1, g(), h(x)); return; return 5;"))
+        self.assertEqual([
+            ('a', 1),
+            ('print', ['a', 2, 3]),
+            ('b', ('call', 'f', [1, ('call', 'g', []), ('call', 'h', ['x'])])),
+            ('return', None),
+            ('return', 5),
+        ], parser.ast)
+
+        # S+ -> S+ S reduces every statement right away, the list is appended in place
+        s_list = parser.lookup_grammar('S+', ('S+', 'S'))
+        spans = [span for production_id, span, children in parser.reduction_events(tokenize("x = 1;" * 2000))
+                 if production_id == s_list]
+        self.assertEqual([(0, 4 * (k + 2)) for k in range(1999)], spans)
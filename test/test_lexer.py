@@ -0,0 +1,91 @@
+import unittest
+
+from util.Lexer import Lexer, Token
+
+token_exprs = [
+    (r'[ \n\t]+', None),
+    (r'#[^\n]*', None),
+    (r'[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?', 'NUMBER'),
+    (r'\(', '('),
+    (r'\)', ')'),
+    (r'\+', '+'),
+    (r'\-', '-'),
+    (r'\*', '*'),
+    (r'\/', '/'),
+    (r'[a-zA-Z_][a-zA-Z0-9_]*', 'IDENTIFIER'),
+]
+
+
+def tokenize(text: str) -> list[tuple]:
+    lexer = Lexer(text, token_exprs)
+    tokens = []
+    while lexer.has_next():
+        token = lexer.next()
+        tokens.append((token.type, token.value))
+    return tokens
+
+
+class LexerTest(unittest.TestCase):
+    def test1(self):
+        self.assertEqual([('IDENTIFIER', 'x'), ('+', '+'), ('NUMBER', '1.5e3'), ('*', '*'), ('(', '('),
+                          ('NUMBER', '2'), ('-', '-'), ('IDENTIFIER', 'y_1'), (')', ')')],
+                         tokenize('x + 1.5e3*(2 - y_1)'))
+
+    def test2(self):
+        # skip tokens in any order and at the end of the input
+        self.assertEqual([('NUMBER', '1'), ('+', '+'), ('NUMBER', '2')], tokenize('1 # one\n  # two\n+ 2 \n'))
+        self.assertEqual([], tokenize('  # nothing\n'))
+
+    def test3(self):
+        lexer = Lexer('1 + $', token_exprs)
+        lexer.next()
+        lexer.next()
+        with self.assertRaises(ValueError):
+            lexer.next()
+        self.assertEqual(4, lexer.pos)
+
+    def test4(self):
+        lexer = Lexer('a +\n  12\n\n# c\nb', token_exprs)
+        tokens = [lexer.next() for _ in range(4)]
+        self.assertEqual([(1, 1), (1, 3), (2, 3), (5, 1)], [(t.line, t.column) for t in tokens])
+        self.assertEqual((6, 8), (tokens[2].start, tokens[2].end))
+        self.assertEqual('12', tokens[2].value)
+        self.assertFalse(hasattr(tokens[2], '__dict__'))
+        self.assertEqual(('$', None, None), (Token('$').type, Token('$').value, Token('$').line))
+        lexer = Lexer('1\n+ $', token_exprs)
+        lexer.next()
+        lexer.next()
+        with self.assertRaisesRegex(ValueError, 'line 2 column 3'):
+            lexer.next()
+
+    def test5(self):
+        lexer = Lexer('a + b * c', token_exprs)
+        a = lexer.next()
+        self.assertEqual('+', lexer.peek().type)
+        self.assertIs(lexer.peek(), lexer.next())
+        lexer.putback(a)
+        self.assertEqual(['a', 'b', '*', 'c'], [t.value for t in lexer])
+        self.assertIsNone(lexer.peek())
+        self.assertFalse(lexer.has_next())
+
+        lexer = Lexer('x + 1 * (y - 2) # z\n', token_exprs)
+        self.assertEqual('x', lexer.peek().value)
+        self.assertEqual(tokenize('x + 1 * (y - 2) # z\n'), [(t.type, t.value) for t in lexer.tokenize_all()])
+        self.assertEqual([], lexer.tokenize_all())
+
+        # illegal input is reported, not taken as the end of the input
+        lexer = Lexer('1 $', token_exprs)
+        lexer.next()
+        with self.assertRaises(ValueError):
+            lexer.has_next()
+        with self.assertRaisesRegex(ValueError, 'column 3'):
+            Lexer('1 $', token_exprs).tokenize_all()
+
+    def test6(self):
+        # an expression that matches the empty string is skipped there, like trying the expressions one by one
+        exprs = [(r'[ ]*', None), (r'x*', 'X'), (r'[a-z]+', 'ID')]
+        self.assertEqual([('ID', 'a'), ('ID', 'b')], [(t.type, t.value) for t in Lexer('a b', exprs).tokenize_all()])
+        lexer = Lexer('a  xx', exprs)
+        self.assertEqual(['a', 'xx'], [t.value for t in lexer])
+        with self.assertRaisesRegex(ValueError, 'column 3'):
+            Lexer('a 1', exprs).tokenize_all()
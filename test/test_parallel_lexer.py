@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from util.Lexer import Lexer, TokenBuffer
+from util.ParallelLexer import tokenize_parallel
+
+token_exprs = [
+    (r'[ \n\t]+', None),
+    (r'/\*[\s\S]*?\*/', None),
+    (r'"[^"]*"', 'STRING'),
+    (r'[0-9]+', 'NUMBER'),
+    (r'[a-z]+', 'NAME'),
+    (r'[-+*/]', 'OP'),
+]
+
+
+def generate(rng: random.Random, size: int) -> str:
+    # strings and comments span lines, so some splits fall inside a token
+    pieces = ['x', 'abc', '12', '+', '*', ' ', '\n', '"a\nb"', '/* c\n\n d */', '"\n"', '/**/']
+    return ''.join(rng.choice(pieces) for _ in range(size))
+
+
+def spans(tokens) -> list[tuple]:
+    return [(t.type, t.start, t.end) for t in tokens]
+
+
+class ParallelLexerTest(unittest.TestCase):
+    def test1(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            text = generate(rng, rng.randint(0, 400))
+            expected = spans(Lexer(text, token_exprs).tokenize_all())
+            for chunk_size in (7, 31, 200):
+                self.assertEqual(expected, spans(tokenize_parallel(text, token_exprs, 1, chunk_size)), text)
+
+    def test2(self):
+        text = generate(random.Random(1), 5000)
+        tokens = tokenize_parallel(text, token_exprs, 2, 1000)
+        expected = Lexer(text, token_exprs).tokenize_all()
+        self.assertEqual(spans(expected), spans(tokens))
+        # the workers send arrays, the tokens are made when they are read
+        self.assertIsInstance(tokens, TokenBuffer)
+        self.assertEqual(len(expected), len(tokens.starts))
+        self.assertEqual(spans(expected[3:7]), spans(tokens[3:7]))
+        self.assertEqual(expected[-1].value, tokens[-1].value)
+        self.assertEqual('x', tokenize_parallel('x\n' * 100, token_exprs, 2, 10)[-1].value)
+
+    def test3(self):
+        # the $ inside a string is fine, the one outside is not
+        text = 'a\n"\n$\n"\nb\nc\n$\nd\n' * 3
+        with self.assertRaisesRegex(ValueError, 'line 7 column 1'):
+            tokenize_parallel(text, token_exprs, 1, 4)
+        with self.assertRaisesRegex(ValueError, 'line 7 column 1'):
+            Lexer(text, token_exprs).tokenize_all()
+
+    def test4(self):
+        # expressions that match the empty string don't stop the chunks from advancing
+        exprs = [(r'[ ]*', None), (r'\n', None), (r'x*', 'X'), (r'[a-z]+', 'NAME')]
+        text = 'ab xx c\n' * 50
+        expected = spans(Lexer(text, exprs).tokenize_all())
+        self.assertEqual(150, len(expected))
+        self.assertEqual(expected, spans(tokenize_parallel(text, exprs, 1, 30)))
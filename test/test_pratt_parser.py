@@ -2,6 +2,7 @@ import unittest
 
 from PrattParse.Lexer import Lexer
 from PrattParse.Tests import TestParser
+from PrattParse.Token import TokenType
 
 passed = 0
 failed = 0
@@ -66,3 +67,28 @@ class LL1Test(unittest.TestCase):
             total = failed + passed
             print("----")
             print(f"Failed {failed} out of {total} tests.")
+
+    def test2(self):
+        source = "a+ bc(d, é)!x1y_z 2 ~?:"
+        expected = [(TokenType.NAME, 'a'), (TokenType.PLUS, '+'), (TokenType.NAME, 'bc'),
+                    (TokenType.LEFT_PAREN, '('), (TokenType.NAME, 'd'), (TokenType.COMMA, ','),
+                    (TokenType.NAME, 'é'), (TokenType.RIGHT_PAREN, ')'), (TokenType.BANG, '!'),
+                    (TokenType.NAME, 'x'), (TokenType.NAME, 'y'), (TokenType.NAME, 'z'), (TokenType.TILDE, '~'),
+                    (TokenType.QUESTION, '?'), (TokenType.COLON, ':'), (TokenType.EOF, '')]
+        lexer = Lexer(source)
+        tokens = [lexer.next() for _ in expected]
+        self.assertEqual(expected, [(t.type, t.text) for t in tokens])
+        self.assertEqual(TokenType.EOF, lexer.next().type)
+        self.assertEqual(expected, [(t.type, t.text) for t in Lexer(source).tokenize()])
+
+    def test3(self):
+        # the lexer takes the same letters as str.isalpha(), '²' and '½' only separate names
+        source = "x² a½bc ³ y"
+        expected = [(TokenType.NAME, 'x'), (TokenType.NAME, 'a'), (TokenType.NAME, 'bc'), (TokenType.NAME, 'y'),
+                    (TokenType.EOF, '')]
+        lexer = Lexer(source)
+        self.assertEqual(expected, [(t.type, t.text) for t in (lexer.next() for _ in expected)])
+        tokens = Lexer(source).tokenize()
+        self.assertEqual(expected, [(t.type, t.text) for t in tokens])
+        # the tokens are offsets into the source
+        self.assertEqual([(0, 1), (3, 4), (5, 7), (10, 11)], [(t.start, t.end) for t in tokens[:-1]])
@@ -67,4 +67,18 @@ class ParserTest(unittest.TestCase):
                */
                42
            '''))
-        
\ No newline at end of file
+        
+    def test10(self):
+        # long runs of skipped comments are consumed in a loop, not by recursion
+        parser = Parser()
+        self.assertEqual({'type': 'Program', 'body': {'type': 'NumericLiteral', 'value': 42}},
+                         parser.parse('// comment\n /* c */ ' * 20000 + '42'))
+
+    def test11(self):
+        from Tokenizer import Tokenizer
+        tokens = list(Tokenizer(' 1 "a" // x\n\'b\' /* y */ 23 '))
+        self.assertEqual([('NUMBER', '1'), ('STRING', '"a"'), ('STRING', "'b'"), ('NUMBER', '23')],
+                         [(t.type, t.value) for t in tokens])
+        self.assertEqual([1, 3, 12, 24], [t.start for t in tokens])
+        with self.assertRaises(SyntaxError):
+            list(Tokenizer('1 +'))
@@ -0,0 +1,64 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+from LR.LALR1Parser import LALR1Parser
+from LR.RecursiveAscent import RecursiveAscentGenerator
+from util.Lexer import Lexer, Token
+
+
+def load_module(path: str):
+    spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class RecursiveAscentTest(unittest.TestCase):
+    token_exprs = [
+        (r'[ \n\t]+', None),
+        (r'[0-9]+', 'NUMBER'),
+        (r'\(', '('),
+        (r'\)', ')'),
+        (r'\+', '+'),
+        (r'\-', '-'),
+        (r'\*', '*'),
+        (r'\/', '/'),
+    ]
+
+    def tokens(self, text):
+        return Lexer(text, self.token_exprs).tokenize_all() + [Token('$', '$')]
+
+    def generate(self, bnf):
+        parser = LALR1Parser(bnf, show_graph_state=False, show_parsing_table=False, print_first_follow=False,
+                             print_ast=False, show_parsing_steps=False)
+        parser.canonical_collection()
+        parser.build_parse_table()
+        path = os.path.join(tempfile.mkdtemp(), f'{bnf[:-4]}_parser.py')
+        RecursiveAscentGenerator(parser).write(path)
+        return parser, load_module(path)
+
+    def test1(self):
+        for bnf in ('g5.bnf', 'g7.bnf', 'g11.bnf'):
+            parser, module = self.generate(bnf)
+            for text in ("1", "1+2*(3 - 4)/5", "((1))-2-3*4"):
+                inputs = self.tokens(text)
+                parser.parse(inputs)
+                self.assertEqual(parser.ast, module.parse(inputs), f'{bnf}: {text}')
+
+    def test2(self):
+        parser, module = self.generate('g5.bnf')
+        with self.assertRaises(AssertionError):
+            module.parse(self.tokens("1+*2"))
+        with self.assertRaises(AssertionError):
+            module.parse(self.tokens("(1"))
+
+    def test3(self):
+        # actions that assign the names of the locals of the generated code
+        parser, module = self.generate('g19.bnf')
+        for text, value in (("2+3*4", 14), ("(1+2)*3+4", 13), ("((5))", 5)):
+            inputs = self.tokens(text)
+            parser.parse(inputs)
+            self.assertEqual(value, parser.ast)
+            self.assertEqual(value, module.parse(inputs))
@@ -857,3 +857,10 @@ class RegexTest(unittest.TestCase):
         while nfa.find(s):
             self.print_groups(nfa)
 
+
+    def test31(self):
+        # the tokens are offsets into the regex, an escape keeps the character it stands for as its value
+        tokens = Scanner(r'a\n\.[b-c]').scan_tokens()
+        self.assertEqual(['a', '\n', '.', '[', 'b', '-', 'c', ']', None], [t.value for t in tokens])
+        self.assertEqual([(0, 1), (1, 3), (3, 5), (5, 6)], [(t.start, t.end) for t in tokens[:4]])
+        self.assertEqual("Token(TokenType.LETTER, 'a')", repr(tokens[0]))
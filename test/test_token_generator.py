@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from util.Lexer import Lexer
+from util.TokenGenerator import FileTokenGenerator
+
+token_exprs = [
+    (r'[ \n\t]+', None),
+    (r'#[^\n]*', None),
+    (r'[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?', 'NUMBER'),
+    (r'\(', '('),
+    (r'\)', ')'),
+    (r'\+', '+'),
+    (r'\-', '-'),
+    (r'\*', '*'),
+    (r'\/', '/'),
+    (r'[a-zA-Z_][a-zA-Z0-9_]*', 'IDENTIFIER'),
+]
+
+
+def tokenize(text: str) -> list[tuple]:
+    return [(token.type, token.value) for token in Lexer(text, token_exprs).tokenize_all()]
+
+
+def write_file(text: str) -> str:
+    fd, path = tempfile.mkstemp()
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+class FileTokenGeneratorTest(unittest.TestCase):
+    def test1(self):
+        text = 'x + 1.5e3*(2 - y_1) # é\n' * 100
+        path = write_file(text)
+        with FileTokenGenerator(path, token_exprs) as generator:
+            tokens = []
+            token = generator.next_token()
+            while token.type != '$':
+                tokens.append((token.type, token.value))
+                token = generator.next_token()
+            self.assertEqual(tokenize(text), tokens)
+            with self.assertRaises(AssertionError):
+                generator.next_token()
+        os.remove(path)
+
+    def test2(self):
+        path = write_file('a + b')
+        generator = FileTokenGenerator(path, token_exprs)
+        tokens = list(generator)
+        self.assertEqual((0, 1), (tokens[0].start, tokens[0].end))
+        self.assertEqual(('IDENTIFIER', 'b'), (tokens[2][0], tokens[2][1]))
+        generator.close()
+        with self.assertRaises(ValueError):
+            tokens[0].value
+        os.remove(path)
+
+        path = write_file('')
+        self.assertEqual('$', FileTokenGenerator(path, token_exprs).next_token().type)
+        os.remove(path)
+
+        path = write_file('1 + $')
+        with FileTokenGenerator(path, token_exprs) as generator, self.assertRaises(ValueError):
+            list(generator)
+        os.remove(path)
+
+    def test3(self):
+        path = write_file('a  b')
+        with FileTokenGenerator(path, [(r'[ ]*', None), (r'[a-z]+', 'ID')]) as generator:
+            self.assertEqual(['a', 'b'], [token.value for token in generator])
+        os.remove(path)
@@ -0,0 +1,37 @@
+import unittest
+
+from PrattParse.Lexer import Lexer as PrattLexer
+from PrattParse.Token import TokenType
+from util.Lexer import Lexer
+from util.TokenStream import TokenStream
+
+token_exprs = [
+    (r'[ \n\t]+', None),
+    (r'[0-9]+', 'NUMBER'),
+    (r'\+', '+'),
+]
+
+
+class TokenStreamTest(unittest.TestCase):
+    def test1(self):
+        stream = TokenStream(iter(range(100)).__next__, capacity=3)
+        self.assertEqual(0, stream.consume())
+        # the ring wraps around before it grows
+        self.assertEqual([1, 2, 3], [stream.look_ahead(d) for d in range(3)])
+        self.assertEqual(1, stream.consume())
+        self.assertEqual(4, stream.look_ahead(2))
+        self.assertEqual(52, stream.look_ahead(50))
+        self.assertEqual(51, len(stream))
+        self.assertEqual(list(range(2, 60)), [stream.consume() for _ in range(58)])
+        self.assertEqual(0, len(stream))
+
+    def test2(self):
+        stream = TokenStream(Lexer('1 + 22 + 3', token_exprs).next)
+        self.assertEqual('3', stream.look_ahead(4).value)
+        self.assertIsNone(stream.look_ahead(5))
+        self.assertEqual(['1', '+', '22', '+', '3'], [stream.consume().value for _ in range(5)])
+        self.assertIsNone(stream.consume())
+
+        stream = TokenStream(PrattLexer('a + b').next)
+        self.assertEqual(TokenType.EOF, stream.look_ahead(5).type)
+        self.assertEqual('a', stream.consume().text)
@@ -1,5 +1,6 @@
 import copy
-import shlex
+
+from util.BnfLexer import BnfLexer
 
 
 class BNF:
@@ -9,7 +10,7 @@ class BNF:
 
 class BnfBuilder:
     def __init__(self, bnf_path: str, prod_delimiter: str = '->', or_delimiter: str = '|', epsilon: str = 'ε',
-                 comment_symbol: str = '//') -> None:
+                 comment_symbol: str = '//', error_symbol: str = 'error') -> None:
         self.bnf_path = bnf_path
         self.prod_delimiter = prod_delimiter
         self.or_delimiter = or_delimiter
@@ -25,9 +26,11 @@ class BnfBuilder:
         self.first_set = None
         self.follow_set = None
         self.grammar_list = []
-        self.semantic_action_cache = []
         self.semantic_action = []
         self.precedence = []
+        # yacc style error token and the terminals that panic mode recovery resynchronizes on
+        self.error_symbol = error_symbol
+        self.sync_tokens = []
 
     def build_first_set(self):
         self.first_set = self.first(self.production_map, epsilon_symbol=self.epsilon)
@@ -36,79 +39,282 @@ class BnfBuilder:
         self.follow_set = self.follow(self.production_map, self.first_set, self.non_terminals, self.start_symbol,
                                       self.epsilon)
 
+    @staticmethod
+    def is_identity_action(semantic_action: str) -> bool:
+        """
+        the action just passes the value of the first symbol up (result=p1).
+        """
+        if not semantic_action:
+            return False
+        return ''.join(semantic_action.strip()[1:-1].split()) == 'result=p1'
+
+    def grammar_size(self) -> dict:
+        return {
+            'non_terminals': len(self.non_terminals),
+            'terminals': len(self.terminals),
+            'productions': len(self.grammar_list),
+            'symbols': sum(len(rhs) for _, rhs in self.grammar_list),
+        }
+
+    def reduce_grammar(self, inline_identity: bool = False) -> dict:
+        """
+        Shrink the grammar before any parser is built on it, must be called after build and before the first and
+        follow sets are built.
+
+        1. remove useless symbols: productions using non-terminals that derive no terminal string, then productions of
+           non-terminals that are not reachable from the start symbol.
+        2. optionally inline single use non-terminals: B -> X with action result=p1 and B used once in the grammar,
+           the use of B is replaced by X.
+        3. merge duplicate alternatives, also the ones made by inlining. the first one and its action is kept (a
+           reduce/reduce conflict between them is resolved to the first one anyway).
+
+        :return: {'before': sizes, 'after': sizes}
+        """
+        before = self.grammar_size()
+        productive = set()
+        is_change = True
+        while is_change:
+            is_change = False
+            for lhs, rhs in self.grammar_list:
+                if lhs not in productive and all(s in productive or s not in self.non_terminals for s in rhs):
+                    productive.add(lhs)
+                    is_change = True
+        if self.start_symbol not in productive:
+            raise AssertionError(f"start symbol {self.start_symbol} doesn't derive any terminal string")
+        keep = [all(s in productive or s not in self.non_terminals for s in rhs) for _, rhs in self.grammar_list]
+
+        reachable = {self.start_symbol}
+        work_list = [self.start_symbol]
+        while work_list:
+            symbol = work_list.pop()
+            for index, (lhs, rhs) in enumerate(self.grammar_list):
+                if lhs != symbol or not keep[index]:
+                    continue
+                for s in rhs:
+                    if s in self.non_terminals and s not in reachable:
+                        reachable.add(s)
+                        work_list.append(s)
+        productions = self._merge_duplicates([(lhs, list(rhs), self.semantic_action[index])
+                                              for index, (lhs, rhs) in enumerate(self.grammar_list)
+                                              if keep[index] and lhs in reachable])
+
+        if inline_identity:
+            precedence_symbols = {s for level in self.precedence for _, s in level}
+            is_change = True
+            while is_change:
+                is_change = False
+                for index, (lhs, rhs, semantic_action) in enumerate(productions):
+                    if lhs == self.start_symbol or len(rhs) != 1 or not self.is_identity_action(semantic_action):
+                        continue
+                    symbol = rhs[0]
+                    # a terminal with precedence would change the precedence of the production using lhs
+                    if symbol in (lhs, self.epsilon, self.error_symbol) or symbol in precedence_symbols:
+                        continue
+                    if sum(1 for p in productions if p[0] == lhs) != 1:
+                        continue
+                    uses = [(p, i) for p in productions for i, s in enumerate(p[1]) if s == lhs]
+                    if len(uses) != 1:
+                        continue
+                    p, i = uses[0]
+                    p[1][i] = symbol
+                    del productions[index]
+                    is_change = True
+                    break
+
+        merged = self._merge_duplicates(productions)
+
+        # update in place, parsers may already hold references to these containers
+        self.grammar_list[:] = [(lhs, tuple(rhs)) for lhs, rhs, _ in merged]
+        self.semantic_action[:] = [semantic_action for _, _, semantic_action in merged]
+        lhs_order = [lhs for lhs in self.production_map if any(p[0] == lhs for p in merged)]
+        self.production_map.clear()
+        for lhs in lhs_order:
+            self.production_map[lhs] = [rhs for p_lhs, rhs, _ in merged if p_lhs == lhs]
+        self.non_terminals.intersection_update(lhs_order)
+        self.symbols.clear()
+        for lhs, rhs, _ in merged:
+            self.symbols.add(lhs)
+            self.symbols.update(s for s in rhs if s != self.epsilon)
+        self.terminals.clear()
+        self.terminals.update(self.symbols - self.non_terminals)
+        return {'before': before, 'after': self.grammar_size()}
+
+    @staticmethod
+    def _merge_duplicates(productions: list[tuple]) -> list[tuple]:
+        merged = []
+        seen = set()
+        for lhs, rhs, semantic_action in productions:
+            if (lhs, tuple(rhs)) not in seen:
+                seen.add((lhs, tuple(rhs)))
+                merged.append((lhs, rhs, semantic_action))
+        return merged
+
     def build(self):
-        file = open(self.bnf_path, "r")
-        line = file.readline()
-        while line:
-            self.current_line = line
-            self.build_production(shlex.split(line))
-            line = file.readline()
-        file.close()
-        if self.semantic_action_cache:
-            self.semantic_action[-1] = ''.join(self.semantic_action_cache)
-            self.semantic_action_cache = []
+        with open(self.bnf_path, "r") as file:
+            text = file.read()
+        lexer = BnfLexer(text, self.prod_delimiter, self.or_delimiter, self.comment_symbol)
+        for item in lexer.items():
+            self.current_line = item[1]
+            self.build_item(item)
+        if any(self.is_ebnf(s) for _, rhs in self.grammar_list for s in rhs):
+            self.desugar_ebnf()
         self.terminals = self.symbols - self.non_terminals
 
-    def _find_index(self, p: list, item) -> int:
-        for index, s in enumerate(p):
-            if s == item:
-                return index
-        return -1
+    @staticmethod
+    def is_ebnf(symbol: str) -> bool:
+        """
+        X*, X+, X? with X a name, or the end of a group ( ... )*, ( ... )+, ( ... )?. Operator tokens like ** or +=
+        are still terminals.
+        """
+        if symbol[-1:] not in ('*', '+', '?') or len(symbol) < 2:
+            return False
+        name = symbol[:-1]
+        return name == ')' or name.replace('_', 'a').replace("'", 'a').isalnum() and not name[0].isdigit()
 
-    def build_production(self, p):
-        if not p:
-            return
-        if p[0] == self.comment_symbol:
-            return
-        if p[0] == '%left' or p[0] == '%right':
-            ps = []
-            for s in p[1:]:
-                ps.append((p[0][1:], s))
-            self.precedence.append(ps)
-            return
-        d_index = self._find_index(p, self.prod_delimiter)
-        if d_index == -1:
-            if not self.current_non_terminal:
-                raise AssertionError(f'No lhs found in "{self.current_line}"')
-            if p[0] != self.or_delimiter:
-                self.semantic_action_cache.append(self.current_line)
-                return
-                # raise AssertionError(f"expect '{self.or_delimiter}' for this line")
-
-            if len(p) == 1:
-                self.production_map[self.current_non_terminal].append([self.epsilon])
-                self.grammar_list.append((self.current_non_terminal, (self.epsilon,)))
-                self.semantic_action.append(None)
-                if self.semantic_action_cache:
-                    self.semantic_action[len(self.grammar_list) - 2] = ''.join(self.semantic_action_cache)
-                    self.semantic_action_cache = []
+    def desugar_ebnf(self):
+        """
+        Compile the EBNF operators into plain productions without right recursion, so the LR stack stays flat for long
+        lists:
+
+            X+      ->  new non-terminal X+ -> X+ X | X, its value is a list, appended in place
+            X*      ->  the production is split into one alternative without X (value []) and one with X+
+            X?      ->  one alternative without X (value None) and one with X
+            ( ... ) ->  new non-terminal for the group, its value is the list of the values in the group (or the
+                        value itself for one symbol), then the operator after ')' applies to it
+
+        Alternatives that drop symbols keep the semantic action, p1...pn are rebound so they still refer to the symbols
+        as written. A production of only optional symbols would get an ε alternative, which the LR parsers don't
+        support, it raises AssertionError. An ε alternative written out with | is kept as is.
+        """
+        grammar_list, semantic_action = self.grammar_list, self.semantic_action
+        self.grammar_list, self.semantic_action = [], []
+        helpers = []
+        for (lhs, rhs), action in zip(grammar_list, semantic_action):
+            if not any(self.is_ebnf(s) for s in rhs):
+                self.grammar_list.append((lhs, rhs))
+                self.semantic_action.append(action)
+                continue
+            items = self._ebnf_items(rhs, helpers, f"{lhs} -> {' '.join(rhs)}")
+            for alternative, alternative_action in self._alternatives(items, action, f"{lhs} -> {' '.join(rhs)}"):
+                self.grammar_list.append((lhs, alternative))
+                self.semantic_action.append(alternative_action)
+        # helper productions go last, the productions as written keep their ids
+        for lhs, rhs, action in helpers:
+            self.grammar_list.append((lhs, rhs))
+            self.semantic_action.append(action)
+        self.production_map = {}
+        self.symbols = set()
+        for lhs, rhs in self.grammar_list:
+            self.production_map.setdefault(lhs, []).append(list(rhs))
+            self.non_terminals.add(lhs)
+            self.symbols.add(lhs)
+            self.symbols.update(s for s in rhs if s != self.epsilon)
 
+    def _ebnf_items(self, rhs: tuple, helpers: list, production: str) -> list[tuple]:
+        """
+        :return: (symbol, None | '*' | '?') for each symbol or group of the rhs, X+ and groups are replaced by helpers
+        """
+        items = []
+        opened = []
+        for index, s in enumerate(rhs):
+            if s == '(':
+                opened.append((len(items), index))
+                items.append((s, None))
+            elif s == ')':
+                # a pair of terminals
+                if opened:
+                    opened.pop()
+                items.append((s, None))
+            elif self.is_ebnf(s) and s[:-1] == ')':
+                if not opened:
+                    raise AssertionError(f"no '(' for '{s}' in: {production}")
+                start, start_index = opened.pop()
+                body = items[start + 1:]
+                del items[start:]
+                if not body:
+                    raise AssertionError(f"empty group in: {production}")
+                name = f"({' '.join(rhs[start_index + 1:index])})"
+                items.append(self._repeat(self._group(name, body, helpers), s[-1], helpers))
+            elif self.is_ebnf(s):
+                items.append(self._repeat(s[:-1], s[-1], helpers))
             else:
-                self.production_map[self.current_non_terminal].append(p[1:])
-                self.grammar_list.append((self.current_non_terminal, tuple(p[1:])))
-                self.semantic_action.append(None)
-                if self.semantic_action_cache:
-                    self.semantic_action[len(self.grammar_list) - 2] = ''.join(self.semantic_action_cache)
-                    self.semantic_action_cache = []
+                items.append((s, None))
+        return items
+
+    def _group(self, name: str, body: list[tuple], helpers: list) -> str:
+        if len(body) == 1 and body[0][1] is None:
+            return body[0][0]
+        if not any(h[0] == name for h in helpers):
+            action = f"{{result = [{', '.join(f'p{i + 1}' for i in range(len(body)))}]}}"
+            for alternative, alternative_action in self._alternatives(body, action, f'group {name}'):
+                helpers.append((name, alternative, alternative_action))
+        return name
+
+    @staticmethod
+    def _repeat(symbol: str, op: str, helpers: list) -> tuple:
+        if op == '?':
+            return symbol, '?'
+        name = symbol + '+'
+        if not any(h[0] == name for h in helpers):
+            helpers.append((name, (symbol,), '{result = [p1]}'))
+            helpers.append((name, (name, symbol), '{p1.append(p2); result = p1}'))
+        return name, '*' if op == '*' else None
+
+    def _alternatives(self, items: list[tuple], action: str, production: str) -> list[tuple]:
+        """
+        expand the optional items into alternatives, rebinding p1...pn in the action to the values as written.
+        """
+        alternatives = [((), [])]
+        for symbol, op in items:
+            expanded = []
+            for symbols, values in alternatives:
+                if op is not None:
+                    expanded.append((symbols, values + ['[]' if op == '*' else 'None']))
+                expanded.append((symbols + (symbol,), values + [f'p{len(symbols) + 1}']))
+            alternatives = expanded
+        result = []
+        for symbols, values in alternatives:
+            if not symbols:
+                raise AssertionError(f"every symbol of {production} is optional, it would derive ε: write the ε "
+                                     f"alternative out with {self.or_delimiter} or make a symbol required")
+            names = [f'p{i + 1}' for i in range(len(values))]
+            alternative_action = action
+            if action and values != names:
+                alternative_action = f"{{{', '.join(names)} = {', '.join(values)}\n{action.strip()[1:-1].strip()}}}"
+            result.append((symbols, alternative_action))
+        return result
 
+    def build_item(self, item: tuple):
+        """
+        add an item of BnfLexer.items() to the grammar
+        """
+        kind = item[0]
+        if kind == 'precedence':
+            self.precedence.append([(item[2], s) for s in item[3]])
+            return
+        if kind == 'sync':
+            self.sync_tokens.extend(item[2])
+            return
+        if kind == 'production':
+            lhs, rhs = item[2], item[3]
+            self.current_non_terminal = lhs
+            self.production_map[lhs] = [rhs]
+            self.non_terminals.add(lhs)
+            if not self.start_symbol:
+                self.start_symbol = lhs
+            symbols = [lhs, *rhs]
+        elif not self.current_non_terminal:
+            raise AssertionError(f'No lhs found in "{self.current_line}"')
+        elif kind == 'action':
+            self.semantic_action[-1] = item[2]
+            return
         else:
-            if d_index != 1:
-                raise AssertionError(f"production delimiter must be after lhs: {self.current_line}")
-            if len(p) <= 2:
-                raise AssertionError(f"no rhs found in :{self.current_line}")
-            else:
-                self.current_non_terminal = p[0]
-                self.production_map[p[0]] = [p[2:]]
-                self.grammar_list.append((self.current_non_terminal, tuple(p[2:])))
-                self.non_terminals.add(p[0])
-                if not self.start_symbol:
-                    self.start_symbol = p[0]
-                self.semantic_action.append(None)
-                if self.semantic_action_cache:
-                    self.semantic_action[(len(self.grammar_list)) - 2] = ''.join(self.semantic_action_cache)
-                    self.semantic_action_cache = []
-
-        for s in p:
+            rhs = item[2] or [self.epsilon]
+            self.production_map[self.current_non_terminal].append(rhs)
+            symbols = rhs
+        self.grammar_list.append((self.current_non_terminal, tuple(rhs)))
+        self.semantic_action.append(None)
+        for s in symbols:
             if s != self.epsilon and s != self.or_delimiter and s != self.prod_delimiter:
                 self.symbols.add(s)
 
@@ -120,30 +326,48 @@ class BnfBuilder:
             #2. X -> Y1Y2...Yn, for each symbol Yi, if 'ε' is not in First(Yi), First(X) = First(X) U First(Yi).
                 If 'ε' is in First(Yi), First(X) = First(X) U First(Yi) U First(Yi+1).
             #3. if X -> ε, add 'ε' to First(X).
+
+        First(X) = init(X) U First(Y) for every non-terminal Y that X reaches by rule #2, init(X) are the terminals
+        (and ε) reached the same way. Solved with digraph over that relation.
         :param grammar:
         :return:
         """
-        result = {}
-        last_result_count = {}
-        is_change = True
+        # 'ε' in First(X) only depends on the first symbol of each rule, so find those first
+        has_epsilon = set()
+        users = {g: [] for g in grammar}
+        work_list = []
         for g in grammar:
-            result[g] = set()
-            last_result_count[g] = 0
-        while is_change:
-            for g in grammar:
-                rhs = grammar[g]
-                for rules in rhs:
-                    for r in rules:
-                        f = copy.deepcopy(result.get(r, {r}))
-                        result[g] |= f
-                        if epsilon_symbol not in f:
+            for rules in grammar[g]:
+                if not rules:
+                    continue
+                r = rules[0]
+                if r == epsilon_symbol:
+                    work_list.append(g)
+                elif r in grammar:
+                    users[r].append(g)
+        while work_list:
+            g = work_list.pop()
+            if g in has_epsilon:
+                continue
+            has_epsilon.add(g)
+            work_list.extend(users[g])
+
+        init = {}
+        edges = {}
+        for g in grammar:
+            init[g] = set()
+            edges[g] = []
+            for rules in grammar[g]:
+                for r in rules:
+                    if r in grammar:
+                        edges[g].append(r)
+                        if r not in has_epsilon:
                             break
-            is_change = False
-            for r in result:
-                if len(result[r]) != last_result_count[r]:
-                    last_result_count[r] = len(result[r])
-                    is_change = True
-        return result
+                    else:
+                        init[g].add(r)
+                        if r != epsilon_symbol:
+                            break
+        return digraph(grammar, edges, init)
 
     @staticmethod
     def follow(grammar: dict, first_set: dict, non_terminals: set, start_symbol: str, epsilon_symbol: str = 'ε',
@@ -153,36 +377,79 @@ class BnfBuilder:
             #1. If S is start symbol,add eof to Follow(S).
             #2. A -> xBy, add {First(y) - ε} to Follow(B).
             #3. A -> xB, add Follow(A) to Follow(B).
+
+        #1 and #2 are the init sets, #3 is the relation solved with digraph.
         :param grammar:
         :param first_set:
         :return:
         """
-        result = {}
-        last_result_count = {}
-        is_change = True
+        init = {}
+        edges = {}
         for g in grammar:
-            result[g] = set()
-            last_result_count[g] = 0
-            if g == start_symbol:
-                result[g].add(eof)
-                last_result_count[g] += 1
+            init[g] = set()
+            edges[g] = []
+        if start_symbol in init:
+            init[start_symbol].add(eof)
+        for g in grammar:
+            for rule in grammar[g]:
+                last = len(rule) - 1
+                for i, s in enumerate(rule):
+                    if s not in non_terminals:
+                        continue
+                    if i == last:
+                        edges[s].append(g)
+                    else:
+                        init[s] |= first_set.get(rule[i + 1], {rule[i + 1]}) - {epsilon_symbol}
+        return digraph(grammar, edges, init)
 
-        while is_change:
-            for g in grammar:
-                rhs = grammar[g]
-                for rule in rhs:
-                    l = len(rule)
-                    for i, s in enumerate(rule):
-                        if s not in non_terminals:
-                            continue
-                        if i == l - 1:
-                            result[s] |= copy.deepcopy(result[g])
-                        else:
-                            result[s] |= copy.deepcopy(first_set.get(rule[i + 1], {rule[i + 1]}) - set(epsilon_symbol))
 
-            is_change = False
-            for r in result:
-                if len(result[r]) != last_result_count[r]:
-                    last_result_count[r] = len(result[r])
-                    is_change = True
-        return result
+def digraph(nodes, edges: dict, init: dict) -> dict:
+    """
+    DeRemer & Pennello's digraph algorithm: F(x) = init(x) U F(y) for all x -> y.
+
+    A Tarjan style traversal finds the strongly connected components, all members of a component get the same set
+    and each set is computed once, components in reverse topological order. Iterative, long chains in big grammars
+    don't hit the recursion limit. The values can be sets or int bitsets, anything with |= and copy.
+    :param nodes:
+    :param edges: x -> list of y
+    :param init:
+    :return: x -> F(x)
+    """
+    done = len(nodes) + 1
+    depth = {x: 0 for x in nodes}
+    index = {}
+    result = {}
+    stack = []
+    for root in nodes:
+        if depth[root]:
+            continue
+        stack.append(root)
+        depth[root] = index[root] = len(stack)
+        result[root] = copy.copy(init[root])
+        frames = [(root, iter(edges[root]))]
+        while frames:
+            x, it = frames[-1]
+            for y in it:
+                if not depth[y]:
+                    stack.append(y)
+                    depth[y] = index[y] = len(stack)
+                    result[y] = copy.copy(init[y])
+                    frames.append((y, iter(edges[y])))
+                    break
+                depth[x] = min(depth[x], depth[y])
+                result[x] |= result[y]
+            else:
+                frames.pop()
+                if frames:
+                    parent = frames[-1][0]
+                    depth[parent] = min(depth[parent], depth[x])
+                    result[parent] |= result[x]
+                if depth[x] == index[x]:
+                    # x is the root of a component, every member gets a copy of its set
+                    while True:
+                        y = stack.pop()
+                        depth[y] = done
+                        if y == x:
+                            break
+                        result[y] = copy.copy(result[x])
+    return result
@@ -0,0 +1,110 @@
+import re
+
+# the words of shlex.split: runs of plain characters, '...' and "..." strings and backslash escapes. A quote or a
+# backslash that starts none of them is unbalanced and matched alone
+_word_regex = re.compile(r'''(?:[^ \t\r\n'"\\]+|'[^']*'|"(?:[^"\\]|\\.)*"|\\.)+|['"\\]''', re.S)
+_quoted_regex = re.compile(r''''([^']*)'|"((?:[^"\\]|\\.)*)"|\\(.)''', re.S)
+_escape_regex = re.compile(r'\\(["\\])')
+_plain_regex = re.compile(r'[^ \t\r\n]+')
+# lines of only whitespace, whitespace as in shlex
+_blank_regex = re.compile(r'^[ \t\r]*(?:\n|\Z)', re.M)
+
+
+def _unquote(m: re.Match) -> str:
+    if m.group(1) is not None:
+        return m.group(1)
+    if m.group(2) is not None:
+        return _escape_regex.sub(r'\1', m.group(2))
+    return m.group(3)
+
+
+class BnfLexer:
+    """
+    One pass lexer of a grammar file. The lines that may declare something start with a keyword (%left, %right, %sync,
+    | or the comment symbol, not quoted) or have the production delimiter, only these are split into words like
+    shlex.split does. A compiled regex skips the lines in between in one match, they are the code of the actions and are
+    sliced from the file as is, without the blank lines.
+
+    items() yields, in the order of the file:
+        ('production', line, lhs, rhs)          lhs -> rhs
+        ('alternative', line, rhs)              | rhs, an empty rhs for a line with only |
+        ('precedence', line, assoc, symbols)    %left or %right
+        ('sync', line, symbols)                 %sync
+        ('action', line, text)                  the lines of the action of the production before it
+    line is the (first) line of the item. Blank lines and comment lines are skipped, also inside an action.
+    """
+
+    def __init__(self, text: str, prod_delimiter: str = '->', or_delimiter: str = '|', comment_symbol: str = '//'):
+        self.text = text
+        self.prod_delimiter = prod_delimiter
+        self.or_delimiter = or_delimiter
+        self.comment_symbol = comment_symbol
+        keywords = '|'.join(re.escape(k) for k in ('%left', '%right', '%sync', or_delimiter, comment_symbol))
+        # a run of lines that neither start with a keyword nor have the delimiter, no lookahead per character
+        c, delimiter = re.escape(prod_delimiter[0]), re.escape(prod_delimiter)
+        self.code_regex = re.compile(rf'(?:(?![ \t\r]*(?:{keywords})(?:[ \t\r\n]|\Z))'
+                                     rf'[^\n{c}]*(?:(?!{delimiter}){c}[^\n{c}]*)*(?:\n|\Z))*')
+        self.comment_regex = re.compile(rf'[ \t\r]*{re.escape(comment_symbol)}(?:[ \t\r\n]|\Z)')
+
+    @staticmethod
+    def split(line: str) -> list[str]:
+        """
+        the words of line, the same as shlex.split(line)
+        """
+        if '"' not in line and "'" not in line and '\\' not in line:
+            return _plain_regex.findall(line)
+        words = []
+        for m in _word_regex.finditer(line):
+            word = m.group()
+            if len(word) == 1 and word in '\'"\\':
+                raise AssertionError(f'no closing quotation or escaped character in: {line}')
+            if '"' in word or "'" in word or '\\' in word:
+                word = _quoted_regex.sub(_unquote, word)
+            words.append(word)
+        return words
+
+    def items(self):
+        text = self.text
+        code_match, comment_match = self.code_regex.match, self.comment_regex.match
+        # the action being read: its first line and its pieces
+        action_line, pieces = None, []
+        position = 0
+        while position < len(text):
+            end = code_match(text, position).end()
+            code = _blank_regex.sub('', text[position:end])
+            if code:
+                if action_line is None:
+                    action_line = code[:code.find('\n') + 1 or len(code)]
+                pieces.append(code)
+            if end == len(text):
+                break
+            position = text.find('\n', end) + 1 or len(text)
+            line = text[end:position]
+            if comment_match(line):
+                continue
+            words = self.split(line)
+            if words[0] in ('%left', '%right'):
+                yield 'precedence', line, words[0][1:], words[1:]
+                continue
+            if words[0] == '%sync':
+                yield 'sync', line, words[1:]
+                continue
+            if words[0] != self.or_delimiter and self.prod_delimiter not in words:
+                # the delimiter in the code of an action
+                if action_line is None:
+                    action_line = line
+                pieces.append(line)
+                continue
+            if action_line is not None:
+                yield 'action', action_line, ''.join(pieces)
+                action_line, pieces = None, []
+            if self.prod_delimiter not in words:
+                yield 'alternative', line, words[1:]
+                continue
+            if words.index(self.prod_delimiter) != 1:
+                raise AssertionError(f"production delimiter must be after lhs: {line}")
+            if len(words) <= 2:
+                raise AssertionError(f"no rhs found in :{line}")
+            yield 'production', line, words[0], words[2:]
+        if action_line is not None:
+            yield 'action', action_line, ''.join(pieces)
@@ -0,0 +1,158 @@
+from util.BnfBuilder import BnfBuilder, digraph
+
+
+class GrammarIR:
+    """
+    Immutable integer view of a grammar built by BnfBuilder, shared by the parser builders so the grammar analyses are
+    computed once.
+
+    Symbols are numbered terminals first (sorted, eof last), then non-terminals (sorted). Production p is
+    lhs[p] -> rhs[rhs_offset[p]:rhs_offset[p + 1]], numbered like BnfBuilder.grammar_list, with production 0 being
+    S' -> S when the grammar is augmented. ε is dropped from the rhs, an ε production has an empty rhs.
+
+    nullable is a bitset over symbol ids, first[x] and follow[x] are bitsets over terminal ids. productions_of[x] are
+    the productions of x, uses[x] the productions with x in their rhs.
+    """
+    __slots__ = ('epsilon', 'eof', 'start', 'symbols', 'symbol_id', 'terminal_count', 'lhs', 'rhs', 'rhs_offset',
+                 'productions_of', 'uses', 'nullable', 'first', 'follow', '_frozen')
+
+    def __init__(self, bnf_builder: BnfBuilder, eof: str = '$', augment: bool = False):
+        self.epsilon = bnf_builder.epsilon
+        self.eof = eof
+        grammar_list = list(bnf_builder.grammar_list)
+        start = bnf_builder.start_symbol
+        non_terminals = set(bnf_builder.non_terminals)
+        if augment:
+            new_start = start + "'"
+            grammar_list.insert(0, (new_start, (start,)))
+            non_terminals.add(new_start)
+            start = new_start
+        terminals = sorted(bnf_builder.terminals - {eof}) + [eof]
+        self.symbols = tuple(terminals + sorted(non_terminals))
+        self.symbol_id = {s: i for i, s in enumerate(self.symbols)}
+        self.terminal_count = len(terminals)
+        self.start = self.symbol_id[start]
+
+        lhs, rhs, rhs_offset = [], [], [0]
+        productions_of = [[] for _ in self.symbols]
+        uses = [[] for _ in self.symbols]
+        for p, (a, body) in enumerate(grammar_list):
+            lhs.append(self.symbol_id[a])
+            productions_of[lhs[-1]].append(p)
+            for s in body:
+                if s == self.epsilon:
+                    continue
+                rhs.append(self.symbol_id[s])
+                if not uses[rhs[-1]] or uses[rhs[-1]][-1] != p:
+                    uses[rhs[-1]].append(p)
+            rhs_offset.append(len(rhs))
+        self.lhs = tuple(lhs)
+        self.rhs = tuple(rhs)
+        self.rhs_offset = tuple(rhs_offset)
+        self.productions_of = tuple(tuple(ps) for ps in productions_of)
+        self.uses = tuple(tuple(ps) for ps in uses)
+        self.nullable = self._build_nullable()
+        self.first = self._build_first()
+        self.follow = self._build_follow()
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f'{type(self).__name__} is immutable')
+        super().__setattr__(name, value)
+
+    def is_terminal(self, x: int) -> bool:
+        return x < self.terminal_count
+
+    def production_count(self) -> int:
+        return len(self.lhs)
+
+    def production_rhs(self, p: int) -> tuple:
+        return self.rhs[self.rhs_offset[p]:self.rhs_offset[p + 1]]
+
+    def _build_nullable(self) -> int:
+        # count the symbols of each production that are not known to be nullable yet
+        remaining = [self.rhs_offset[p + 1] - self.rhs_offset[p] for p in range(len(self.lhs))]
+        work_list = [self.lhs[p] for p, n in enumerate(remaining) if n == 0]
+        nullable = 0
+        while work_list:
+            x = work_list.pop()
+            if nullable >> x & 1:
+                continue
+            nullable |= 1 << x
+            for p in self.uses[x]:
+                remaining[p] -= sum(1 for s in self.production_rhs(p) if s == x)
+                if remaining[p] == 0:
+                    work_list.append(self.lhs[p])
+        return nullable
+
+    def _build_first(self) -> tuple:
+        """
+        FIRST(X) = U FIRST(Yi) for X -> Y1...Yn while Y1...Yi-1 are nullable.
+        """
+        nodes = range(len(self.symbols))
+        init = [1 << x if self.is_terminal(x) else 0 for x in nodes]
+        edges = [[] for _ in nodes]
+        for p, a in enumerate(self.lhs):
+            for s in self.production_rhs(p):
+                edges[a].append(s)
+                if not self.nullable >> s & 1:
+                    break
+        result = digraph(nodes, edges, init)
+        return tuple(result[x] for x in nodes)
+
+    def _build_follow(self) -> tuple:
+        """
+        A -> αBβ: FIRST(β) is in FOLLOW(B), and FOLLOW(A) too if β is nullable. eof follows the start symbol.
+        """
+        nodes = range(len(self.symbols))
+        init = [0 for _ in nodes]
+        init[self.start] = 1 << self.symbol_id[self.eof]
+        edges = [[] for _ in nodes]
+        for p, a in enumerate(self.lhs):
+            body = self.production_rhs(p)
+            first, nullable = 0, True
+            for s in reversed(body):
+                if not self.is_terminal(s):
+                    init[s] |= first
+                    if nullable:
+                        edges[s].append(a)
+                if self.nullable >> s & 1:
+                    first |= self.first[s]
+                else:
+                    first, nullable = self.first[s], False
+        result = digraph(nodes, edges, init)
+        return tuple(0 if self.is_terminal(x) else result[x] for x in nodes)
+
+    def sequence_first(self, symbols) -> tuple[int, bool]:
+        """
+        :return: (FIRST of the symbol sequence as a bitset, whether the whole sequence is nullable)
+        """
+        result = 0
+        for s in symbols:
+            result |= self.first[s]
+            if not self.nullable >> s & 1:
+                return result, False
+        return result, True
+
+    def names(self, bits: int) -> set[str]:
+        result = set()
+        while bits:
+            low = bits & -bits
+            result.add(self.symbols[low.bit_length() - 1])
+            bits ^= low
+        return result
+
+    def first_set(self) -> dict[str, set[str]]:
+        """
+        FIRST of the non-terminals in the shape of BnfBuilder.first_set, ε included for nullable ones.
+        """
+        result = {}
+        for x in range(self.terminal_count, len(self.symbols)):
+            result[self.symbols[x]] = self.names(self.first[x])
+            if self.nullable >> x & 1:
+                result[self.symbols[x]].add(self.epsilon)
+        return result
+
+    def follow_set(self) -> dict[str, set[str]]:
+        return {self.symbols[x]: self.names(self.follow[x]) for x in range(self.terminal_count, len(self.symbols))}
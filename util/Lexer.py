@@ -1,3 +1,6 @@
+import array
+import bisect
+import functools
 import re
 
 # Define the regular expressions for each token type
@@ -12,11 +15,64 @@ TOKEN_REGEX = [
 ]
 
 
+class Source:
+    """
+    Text the tokens point into, str or bytes (decoded with encoding). The offsets of the newlines are only indexed when
+    a line/column is asked for.
+    """
+    __slots__ = ('text', 'encoding', '_newlines')
+
+    def __init__(self, text, encoding=None):
+        self.text = text
+        self.encoding = encoding
+        self._newlines = None
+
+    def substring(self, start, end):
+        if self.encoding:
+            return self.text[start:end].decode(self.encoding)
+        return self.text[start:end]
+
+    def line_column(self, offset) -> tuple[int, int]:
+        """
+        :return: 1-based (line, column) of offset, the column counts bytes for bytes text
+        """
+        if self._newlines is None:
+            newline = b'\n' if self.encoding else '\n'
+            self._newlines = array.array('q', (m.start() for m in re.finditer(re.escape(newline), self.text)))
+        line = bisect.bisect_left(self._newlines, offset)
+        line_start = self._newlines[line - 1] + 1 if line else 0
+        return line + 1, offset - line_start + 1
+
+
 # Define the Token class to hold each token's type and value
 class Token:
-    def __init__(self, token_type, value):
+    """
+    A token made by a lexer only keeps its offsets into the source, value is sliced from the source on access.
+    Tokens made by hand carry their value, so do lexer tokens whose value is not their text (an unescaped character),
+    they still have their position.
+    """
+    __slots__ = ('type', '_value', 'source', 'start', 'end')
+
+    def __init__(self, token_type, value=None, source: Source = None, start=-1, end=-1):
         self.type = token_type
-        self.value = value
+        self._value = value
+        self.source = source
+        self.start = start
+        self.end = end
+
+    @property
+    def value(self):
+        if self._value is not None or self.source is None:
+            return self._value
+        return self.source.substring(self.start, self.end)
+
+    @property
+    def line(self):
+        return self.source.line_column(self.start)[0] if self.source else None
+
+    @property
+    def column(self):
+        return self.source.line_column(self.start)[1] if self.source else None
 
     def __repr__(self):
         return f'Token({self.type}, {self.value})'
@@ -30,52 +86,169 @@ class Token:
             raise ValueError(f"index:{index} not support")
 
 
+class TokenBuffer:
+    """
+    Tokens as a struct of arrays: type id, start and end offset of every token, tags[type id] is the token type. A
+    Token is only made when it is read by index or iteration, the buffer itself takes 20 bytes per token.
+    """
+
+    def __init__(self, tags: list, source: Source, types: array.array = None, starts: array.array = None,
+                 ends: array.array = None):
+        self.tags = tags
+        self.source = source
+        self.types = array.array('i') if types is None else types
+        self.starts = array.array('q') if starts is None else starts
+        self.ends = array.array('q') if ends is None else ends
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Token(self.tags[self.types[index]], source=self.source, start=self.starts[index], end=self.ends[index])
+
+    def __iter__(self):
+        tags, source = self.tags, self.source
+        for token_type, start, end in zip(self.types, self.starts, self.ends):
+            yield Token(tags[token_type], source=source, start=start, end=end)
+
+
+@functools.lru_cache(maxsize=32)
+def compile_token_exprs(token_exprs: tuple) -> tuple:
+    """
+    Compile the token expressions once into a single alternation, expression i becomes the named group Ti.
+    Alternation tries the expressions in order and takes the first that matches, like trying them one by one.
+    The patterns are either all str or all bytes.
+
+    :return: (regex, {group name: tag})
+    """
+    if token_exprs and isinstance(token_exprs[0][0], bytes):
+        regex = re.compile(b'|'.join(b'(?P<T%d>%s)' % (i, pattern) for i, (pattern, _) in enumerate(token_exprs)))
+    else:
+        regex = re.compile('|'.join(f'(?P<T{i}>{pattern})' for i, (pattern, _) in enumerate(token_exprs)))
+    return regex, {f'T{i}': tag for i, (_, tag) in enumerate(token_exprs)}
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_after(token_exprs: tuple, index: int):
+    """
+    the alternation of the expressions after index, with the same group names. None after the last one.
+    """
+    if index + 1 == len(token_exprs):
+        return None
+    if isinstance(token_exprs[0][0], bytes):
+        return re.compile(b'|'.join(b'(?P<T%d>%s)' % (i, token_exprs[i][0])
+                                    for i in range(index + 1, len(token_exprs))))
+    return re.compile('|'.join(f'(?P<T{i}>{token_exprs[i][0]})' for i in range(index + 1, len(token_exprs))))
+
+
+def match_after_empty(token_exprs: tuple, m, text, pos):
+    """
+    m matched the empty string at pos, which would never advance. Like trying the expressions one by one, an empty
+    match counts as no match and the expressions after it are tried.
+
+    :return: the first non empty match at pos, None if there is none
+    """
+    while m is not None and m.end() == pos:
+        regex = _compile_after(token_exprs, int(m.lastgroup[1:]))
+        m = regex.match(text, pos) if regex is not None else None
+    return m
+
+
 # Define the Lexer class to tokenize the input text
 class Lexer:
+    """
+    Peekable token stream: peek() lexes one token ahead into current_token, tokens given back by putback() come
+    first. Illegal characters raise ValueError from whichever call reaches them, has_next() included.
+    """
+
     def __init__(self, input, token_exprs):
         self.input = input
+        self.source = Source(input)
         self.pos = 0
         self.token_exprs = token_exprs
+        self.exprs = tuple(tuple(e) for e in token_exprs)
+        self.regex, self.tags = compile_token_exprs(self.exprs)
         self.cached_tokens = []
         self.current_token = None
 
+    def _illegal_character(self, pos):
+        self.pos = pos
+        return ValueError('Illegal character: %s at line %d column %d' % (self.input[pos], *self.source.line_column(pos)))
+
     def _get_next_token(self):
-        if self.pos >= len(self.input):
-            return None
-        for token_expr in self.token_exprs:
-            pattern, tag = token_expr
-            regex = re.compile(pattern)
-            match = regex.match(self.input, self.pos)
-            if match:
-                text = match.group(0)
-                if tag:
-                    token = Token(tag, text)
-                    self.pos = match.end(0)
-                    return token
-                else:
-                    self.pos = match.end(0)
-                    continue
-        else:
-            raise ValueError('Illegal character: %s' % self.input[self.pos])
+        text, pos = self.input, self.pos
+        match, tags, source = self.regex.match, self.tags, self.source
+        # skip tokens (tag None) are consumed inline
+        while pos < len(text):
+            m = match(text, pos)
+            if m is not None and m.end() == pos:
+                m = match_after_empty(self.exprs, m, text, pos)
+            if m is None:
+                raise self._illegal_character(pos)
+            start, pos = pos, m.end()
+            tag = tags[m.lastgroup]
+            if tag:
+                self.pos = pos
+                return Token(tag, source=source, start=start, end=pos)
+        self.pos = pos
+        return None
 
     def next(self):
+        """
+        :return: the next token, None at the end of the input
+        """
         if self.cached_tokens:
             return self.cached_tokens.pop()
-        token = self._get_next_token()
-        return token
+        token = self.current_token
+        if token is not None:
+            self.current_token = None
+            return token
+        return self._get_next_token()
+
+    def peek(self):
+        if self.cached_tokens:
+            return self.cached_tokens[-1]
+        if self.current_token is None:
+            self.current_token = self._get_next_token()
+        return self.current_token
 
     def putback(self, token):
         self.cached_tokens.append(token)
 
     def has_next(self):
-        if self.cached_tokens:
-            return True
-        try:
-            token = self._get_next_token()
-            if token:
-                self.putback(token)
-                return True
-            else:
-                return False
-        except ValueError:
-            return False
+        return self.peek() is not None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        token = self.next()
+        if token is None:
+            raise StopIteration
+        return token
+
+    def tokenize_all(self) -> list[Token]:
+        """
+        all the remaining tokens in one pass
+        """
+        tokens = self.cached_tokens[::-1]
+        self.cached_tokens = []
+        if self.current_token is not None:
+            tokens.append(self.current_token)
+            self.current_token = None
+        text, pos, end = self.input, self.pos, len(self.input)
+        match, tags, source, append = self.regex.match, self.tags, self.source, tokens.append
+        while pos < end:
+            m = match(text, pos)
+            if m is not None and m.end() == pos:
+                m = match_after_empty(self.exprs, m, text, pos)
+            if m is None:
+                raise self._illegal_character(pos)
+            start, pos = pos, m.end()
+            tag = tags[m.lastgroup]
+            if tag:
+                append(Token(tag, source=source, start=start, end=pos))
+        self.pos = pos
+        return tokens
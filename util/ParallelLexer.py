@@ -0,0 +1,163 @@
+import array
+import bisect
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from util.Lexer import Lexer, TokenBuffer, match_after_empty
+
+# lexer of the worker process, inherited from the parent when the pool forks, else set by _init_worker
+_worker_lexer = None
+
+
+def split_points(text: str, chunks: int) -> list[int]:
+    """
+    chunk starts, each one just after the first newline past an even split of the text. A newline usually ends a
+    token, stitch() repairs the chunks where it doesn't (inside a string or a block comment).
+    """
+    points = [0]
+    for i in range(1, chunks):
+        point = text.find('\n', len(text) * i // chunks) + 1
+        if point <= points[-1]:
+            break
+        points.append(point)
+    return points
+
+
+def _init_worker(path: str, token_exprs: tuple):
+    global _worker_lexer
+    with open(path, encoding='utf-8', errors='surrogatepass', newline='') as file:
+        _worker_lexer = Lexer(file.read(), token_exprs)
+
+
+def _expression_of_group(lexer: Lexer) -> list[int]:
+    # group number of the named group Ti -> i
+    result = [-1] * (lexer.regex.groups + 1)
+    for name, group in lexer.regex.groupindex.items():
+        if name in lexer.tags:
+            result[group] = int(name[1:])
+    return result
+
+
+def _match(lexer: Lexer, expression_of_group: list[int], pos: int) -> tuple:
+    """
+    :return: (match, token expression) at pos, (None, -1) if no expression matches a non empty string there
+    """
+    m = lexer.regex.match(lexer.input, pos)
+    if m is None:
+        return None, -1
+    if m.end() == pos:
+        m = match_after_empty(lexer.exprs, m, lexer.input, pos)
+        return m, -1 if m is None else int(m.lastgroup[1:])
+    return m, expression_of_group[m.lastindex]
+
+
+def lex_chunk(lexer: Lexer, start: int, end: int) -> tuple:
+    """
+    Lex the text from start as if start were a token boundary, up to the first match ending at or after end.
+
+    :return: (token expression, start and end of each token as arrays, stop position, whether lexing stopped at an
+              illegal character)
+    """
+    expression_of_group = _expression_of_group(lexer)
+    is_token = [tag is not None for _, tag in lexer.exprs]
+    types, starts, ends = array.array('i'), array.array('q'), array.array('q')
+    pos = start
+    while pos < end:
+        m, expression = _match(lexer, expression_of_group, pos)
+        if m is None:
+            return types, starts, ends, pos, True
+        if is_token[expression]:
+            types.append(expression)
+            starts.append(pos)
+            ends.append(m.end())
+        pos = m.end()
+    return types, starts, ends, pos, False
+
+
+def _lex_chunk(start: int, end: int) -> tuple:
+    return lex_chunk(_worker_lexer, start, end)
+
+
+def stitch(lexer: Lexer, points: list[int], results: list[tuple]) -> TokenBuffer:
+    """
+    Join the token arrays of the chunks into the tokens of the sequential lexer, without making a Token. A chunk is
+    exact when the previous chunk stopped on its start. Otherwise a token ran across the split, the text is lexed
+    sequentially from where the previous chunk stopped until it lands on a token start of the chunk, from there on both
+    lex the same.
+    """
+    text = lexer.input
+    expression_of_group = _expression_of_group(lexer)
+    tokens = TokenBuffer([tag for _, tag in lexer.exprs], lexer.source)
+    types, starts, ends = tokens.types, tokens.starts, tokens.ends
+
+    def lex_one(pos: int) -> int:
+        m, expression = _match(lexer, expression_of_group, pos)
+        if m is None:
+            raise lexer._illegal_character(pos)
+        if lexer.exprs[expression][1] is not None:
+            types.append(expression)
+            starts.append(pos)
+            ends.append(m.end())
+        return m.end()
+
+    pos = 0
+    for start, (chunk_types, chunk_starts, chunk_ends, stop, error) in zip(points, results):
+        k = 0
+        if pos != start:
+            k = bisect.bisect_left(chunk_starts, pos)
+            while (k == len(chunk_starts) or chunk_starts[k] != pos) and pos < stop:
+                pos = lex_one(pos)
+                k = bisect.bisect_left(chunk_starts, pos, k)
+            if k == len(chunk_starts) or chunk_starts[k] != pos:
+                continue
+        types.extend(chunk_types[k:])
+        starts.extend(chunk_starts[k:])
+        ends.extend(chunk_ends[k:])
+        pos = stop
+        if error:
+            raise lexer._illegal_character(pos)
+    while pos < len(text):
+        pos = lex_one(pos)
+    return tokens
+
+
+def _pool(text: str, exprs: tuple, processes: int, directory: str) -> ProcessPoolExecutor:
+    """
+    a pool whose workers have a lexer over text. Forked workers inherit it, others read the text from a file, it is
+    never pickled.
+    """
+    global _worker_lexer
+    if 'fork' in multiprocessing.get_all_start_methods():
+        _worker_lexer = Lexer(text, exprs)
+        return ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('fork'))
+    path = os.path.join(directory, 'input')
+    with open(path, 'w', encoding='utf-8', errors='surrogatepass', newline='') as file:
+        file.write(text)
+    return ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(path, exprs))
+
+
+def tokenize_parallel(text: str, token_exprs, processes: int = None, chunk_size: int = 1 << 22) -> TokenBuffer:
+    """
+    Tokens of text, the same as Lexer(text, token_exprs).tokenize_all(), lexed in chunks of about chunk_size
+    characters by a pool of processes. The workers send back arrays of token types and offsets, they are joined into a
+    TokenBuffer that makes the Tokens when they are read. processes=1 lexes the chunks one after another in this
+    process.
+    """
+    global _worker_lexer
+    lexer = Lexer(text, token_exprs)
+    processes = processes or os.cpu_count() or 1
+    chunks = max(1, len(text) // chunk_size)
+    points = split_points(text, chunks)
+    ends = points[1:] + [len(text)]
+    if processes == 1 or len(points) == 1:
+        results = [lex_chunk(lexer, start, end) for start, end in zip(points, ends)]
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            try:
+                with _pool(text, lexer.exprs, processes, directory) as executor:
+                    results = list(executor.map(_lex_chunk, points, ends))
+            finally:
+                _worker_lexer = None
+    return stitch(lexer, points, results)
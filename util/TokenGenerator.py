@@ -1,4 +1,7 @@
-from util.Lexer import Lexer, Token
+import mmap
+import os
+
+from util.Lexer import Lexer, Source, Token, compile_token_exprs, match_after_empty
 
 
 class TokenGenerator:
@@ -12,16 +15,72 @@ class TokenGenerator:
     def next_token(self):
         if self.reach_end:
             raise AssertionError("File read completed")
-        if self.lexer.has_next():
-            return self.lexer.next()
-        else:
+        token = self.lexer.next()
+        if token is None:
             self.reach_end = True
             return Token('$', None)
+        return token
 
 
 class FileTokenGenerator(TokenGenerator):
-    def __init__(self, file_path, token_expr):
-        super(FileTokenGenerator, self).__init__()
+    """
+    Token source over a memory mapped file, the file is never read into memory as a whole. The token expressions are
+    encoded and matched as bytes patterns, so character classes like \\w only cover ASCII. Tokens are generated on
+    demand and keep offsets into the mapping, their value is decoded on access and only readable until close().
+    """
+
+    def __init__(self, file_path, token_expr, encoding='utf-8'):
+        # TokenGenerator.__init__ reads the whole file, don't call it
+        self.file_path = file_path
+        self.reach_end = False
+        self.encoding = encoding
+        self.exprs = tuple((pattern.encode(encoding), tag) for pattern, tag in token_expr)
+        self.regex, self.tags = compile_token_exprs(self.exprs)
+        with open(file_path, 'rb') as file_object:
+            # an empty file can't be mapped
+            if os.fstat(file_object.fileno()).st_size:
+                self.buffer = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.buffer = b''
+        self.tokens = self.scan()
+
+    def scan(self):
+        buffer, match, tags = self.buffer, self.regex.match, self.tags
+        source = Source(buffer, self.encoding)
+        pos, end = 0, len(buffer)
+        while pos < end:
+            m = match(buffer, pos)
+            if m is not None and m.end() == pos:
+                m = match_after_empty(self.exprs, m, buffer, pos)
+            if m is None:
+                raise ValueError('Illegal character: %s at line %d column %d'
+                                 % (buffer[pos:pos + 1].decode(self.encoding, 'replace'), *source.line_column(pos)))
+            start, pos = pos, m.end()
+            tag = tags[m.lastgroup]
+            if tag:
+                yield Token(tag, source=source, start=start, end=pos)
+
+    def __iter__(self):
+        return self.tokens
+
+    def next_token(self):
+        if self.reach_end:
+            raise AssertionError("File read completed")
+        token = next(self.tokens, None)
+        if token is None:
+            self.reach_end = True
+            return Token('$', None)
+        return token
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
 class StringTokenGenerator(TokenGenerator):
@@ -0,0 +1,50 @@
+from typing import Any, Callable
+
+
+class TokenStream:
+    """
+    Lookahead buffer over any token source with a next token function (util.Lexer.next, PrattParse.Lexer.next,
+    Tokenizer.get_next_token, ...). The buffered tokens live in a ring buffer whose capacity is a power of two, so
+    look_ahead(distance) and consume() are O(1) for any distance. The buffer doubles when a look ahead needs more room.
+    """
+
+    def __init__(self, next_token: Callable[[], Any], capacity: int = 16):
+        self._next_token = next_token
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self._buffer = [None] * size
+        self._mask = size - 1
+        # index of look_ahead(0) in the buffer and number of buffered tokens
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        """
+        number of buffered tokens
+        """
+        return self._count
+
+    def _grow(self):
+        buffer, head = self._buffer, self._head
+        self._buffer = buffer[head:] + buffer[:head] + [None] * len(buffer)
+        self._mask = len(self._buffer) - 1
+        self._head = 0
+
+    def look_ahead(self, distance: int = 0):
+        while distance >= self._count:
+            if self._count > self._mask:
+                self._grow()
+            self._buffer[(self._head + self._count) & self._mask] = self._next_token()
+            self._count += 1
+        return self._buffer[(self._head + distance) & self._mask]
+
+    def consume(self):
+        if not self._count:
+            return self._next_token()
+        head = self._head
+        token = self._buffer[head]
+        self._buffer[head] = None
+        self._head = (head + 1) & self._mask
+        self._count -= 1
+        return token